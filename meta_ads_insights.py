@@ -1,32 +1,120 @@
 #!/usr/bin/env python3
 import argparse
-import json
+import hashlib
+import heapq
 import os
 import statistics
+import sys
+import time
 from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import Dict, List, Optional, Tuple
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+import orjson
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 
 
 API_BASE = "https://graph.facebook.com"
+CACHE_DIR = Path(os.getenv("META_CACHE_DIR", Path.home() / ".cache" / "meta_insights"))
+ACCOUNTS_CACHE_TTL = 24 * 3600
+INSIGHTS_CACHE_TTL = 3600
+CACHE_MAX_AGE = max(ACCOUNTS_CACHE_TTL, INSIGHTS_CACHE_TTL)
+ASYNC_REPORT_MIN_DAYS = 30
+ASYNC_REPORT_POLL_SECONDS = 5
+ASYNC_REPORT_MAX_WAIT_SECONDS = int(os.getenv("META_ASYNC_REPORT_MAX_WAIT", "900"))
+
+
+def build_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount("https://", adapter)
+    accept_encoding = make_headers(accept_encoding=True)["accept-encoding"]
+    session.headers.update({"Accept-Encoding": accept_encoding, "Connection": "keep-alive"})
+    return session
+
+
+_SESSION = build_session()
+
+LEAD_KEYS = frozenset(
+    {
+        "lead",
+        "onsite_conversion.lead_grouped",
+        "offsite_conversion.fb_pixel_lead",
+    }
+)
+PURCHASE_KEYS = frozenset(
+    {
+        "purchase",
+        "offsite_conversion.fb_pixel_purchase",
+        "omni_purchase",
+    }
+)
+
+INSIGHTS_THROTTLE_HEADER = "x-fb-ads-insights-throttle"
+THROTTLE_SOFT_LIMIT_PCT = 70.0
+
 
+def respect_insights_throttle(response: requests.Response) -> None:
+    raw = response.headers.get(INSIGHTS_THROTTLE_HEADER)
+    if not raw:
+        return
+    try:
+        throttle = orjson.loads(raw)
+    except ValueError:
+        return
+    usage = max(
+        float(throttle.get("app_id_util_pct") or 0),
+        float(throttle.get("acc_id_util_pct") or 0),
+    )
+    if usage < THROTTLE_SOFT_LIMIT_PCT:
+        return
+    pause = 2.0 + (usage - THROTTLE_SOFT_LIMIT_PCT) / 2
+    print(f"Uso da cota de insights em {usage:.0f}%, aguardando {pause:.0f}s...")
+    time.sleep(pause)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class CampaignMetrics:
     campaign_name: str
     spend: float
     impressions: int
     clicks: int
-    ctr: float
-    cpc: float
-    cpm: float
     leads: float
     purchases: float
     purchase_value: float
 
+    @property
+    def ctr(self) -> float:
+        if self.impressions <= 0:
+            return 0.0
+        return self.clicks / self.impressions * 100
+
+    @property
+    def cpc(self) -> float:
+        if self.clicks <= 0:
+            return 0.0
+        return self.spend / self.clicks
+
+    @property
+    def cpm(self) -> float:
+        if self.impressions <= 0:
+            return 0.0
+        return self.spend / self.impressions * 1000
+
     @property
     def roas(self) -> Optional[float]:
         if self.spend <= 0:
@@ -37,7 +125,7 @@ class CampaignMetrics:
 
 
 def safe_float(value: Optional[str]) -> float:
-    if value in (None, ""):
+    if not value:
         return 0.0
     try:
         return float(value)
@@ -46,7 +134,7 @@ def safe_float(value: Optional[str]) -> float:
 
 
 def safe_int(value: Optional[str]) -> int:
-    if value in (None, ""):
+    if not value:
         return 0
     try:
         return int(float(value))
@@ -54,31 +142,190 @@ def safe_int(value: Optional[str]) -> int:
         return 0
 
 
-def extract_action_value(actions: Optional[List[Dict]], keys: Tuple[str, ...]) -> float:
-    if not actions:
-        return 0.0
-    total = 0.0
-    for item in actions:
-        action_type = item.get("action_type", "")
-        if action_type in keys:
-            total += safe_float(item.get("value"))
-    return total
+def _split_actions(
+    actions: Optional[List[Dict]],
+    action_values: Optional[List[Dict]],
+    to_float: Callable[[Any], float],
+) -> Tuple[float, float, float]:
+    leads = 0.0
+    purchases = 0.0
+    purchase_value = 0.0
+    for item in actions or ():
+        action_type = item.get("action_type")
+        if action_type in LEAD_KEYS:
+            value = item.get("value")
+            if value:
+                leads += to_float(value)
+        elif action_type in PURCHASE_KEYS:
+            value = item.get("value")
+            if value:
+                purchases += to_float(value)
+    for item in action_values or ():
+        if item.get("action_type") in PURCHASE_KEYS:
+            value = item.get("value")
+            if value:
+                purchase_value += to_float(value)
+    return leads, purchases, purchase_value
+
+
+def split_actions(
+    actions: Optional[List[Dict]], action_values: Optional[List[Dict]]
+) -> Tuple[float, float, float]:
+    try:
+        return _split_actions(actions, action_values, float)
+    except (TypeError, ValueError):
+        return _split_actions(actions, action_values, safe_float)
+
+
+def cache_path(url: str, params: Optional[Dict] = None) -> Path:
+    split = urlsplit(url)
+    query = dict(parse_qsl(split.query))
+    query.update({k: str(v) for k, v in (params or {}).items()})
+    token = query.pop("access_token", "")
+    key = orjson.dumps(
+        [
+            f"{split.scheme}://{split.netloc}{split.path}",
+            sorted(query.items()),
+            hashlib.sha256(token.encode("utf-8")).hexdigest(),
+        ]
+    )
+    return CACHE_DIR / f"{hashlib.sha256(key).hexdigest()}.json"
 
 
-def meta_get(path: str, token: str, params: Optional[Dict] = None) -> Dict:
+def cache_load(path: Path, ttl: int) -> Optional[Dict]:
+    if ttl <= 0:
+        return None
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+_cache_pruned = False
+
+
+def prune_cache() -> None:
+    """Delete cache files no TTL can still serve; runs once per process, on the first store."""
+    global _cache_pruned
+    if _cache_pruned:
+        return
+    _cache_pruned = True
+    cutoff = time.time() - CACHE_MAX_AGE
+    try:
+        entries = list(CACHE_DIR.iterdir())
+    except OSError:
+        return
+    for entry in entries:
+        if entry.suffix not in (".json", ".tmp"):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+        except OSError:
+            pass
+
+
+def cache_store(path: Path, content: bytes) -> None:
+    prune_cache()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(content)
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
+def strip_paging_tokens(payload: Dict) -> bool:
+    """Remove access_token from paging.next/previous in place so cached bodies never hold the token."""
+    paging = payload.get("paging")
+    if not isinstance(paging, dict):
+        return False
+    stripped = False
+    for key in ("next", "previous"):
+        url = paging.get(key)
+        if not url or "access_token=" not in url:
+            continue
+        split = urlsplit(url)
+        query = [(k, v) for k, v in parse_qsl(split.query, keep_blank_values=True) if k != "access_token"]
+        paging[key] = urlunsplit(split._replace(query=urlencode(query)))
+        stripped = True
+    return stripped
+
+
+def fetch_json(url: str, params: Optional[Dict], error_label: str, cache_ttl: int) -> Dict:
+    cached_file = cache_path(url, params)
+    cached = cache_load(cached_file, cache_ttl)
+    if cached is not None:
+        return cached
+
+    response = _SESSION.get(url, params=params, timeout=30)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{error_label} ({response.status_code}): {response.text}")
+    respect_insights_throttle(response)
+    payload = orjson.loads(response.content)
+    content = response.content
+    if strip_paging_tokens(payload):
+        content = orjson.dumps(payload)
+    if cache_ttl > 0:
+        cache_store(cached_file, content)
+    return payload
+
+
+def meta_get(path: str, token: str, params: Optional[Dict] = None, cache_ttl: int = 0) -> Dict:
     url = f"{API_BASE}{path}"
     query = params.copy() if params else {}
     query["access_token"] = token
+    return fetch_json(url, query, "Erro na Meta API", cache_ttl)
 
-    response = requests.get(url, params=query, timeout=30)
+
+def meta_get_next(next_url: str, token: str, cache_ttl: int = 0) -> Dict:
+    # Paging URLs come back without access_token (see strip_paging_tokens), so add it again here.
+    return fetch_json(next_url, {"access_token": token}, "Erro na paginação", cache_ttl)
+
+
+def meta_post(path: str, token: str, params: Optional[Dict] = None) -> Dict:
+    data = params.copy() if params else {}
+    data["access_token"] = token
+    response = _SESSION.post(f"{API_BASE}{path}", data=data, timeout=30)
     if response.status_code >= 400:
         raise RuntimeError(
             f"Erro na Meta API ({response.status_code}): {response.text}"
         )
-    return response.json()
+    respect_insights_throttle(response)
+    return orjson.loads(response.content)
+
 
+def run_async_insights_report(token: str, graph_version: str, ad_account_id: str, params: Dict) -> str:
+    job = meta_post(f"/{graph_version}/act_{ad_account_id}/insights", token, params=params)
+    report_run_id = job.get("report_run_id")
+    if not report_run_id:
+        raise RuntimeError(f"Meta API não retornou report_run_id: {job}")
 
-def list_ad_accounts(token: str, graph_version: str) -> List[Dict]:
+    deadline = time.monotonic() + ASYNC_REPORT_MAX_WAIT_SECONDS
+    while True:
+        status = meta_get(
+            f"/{graph_version}/{report_run_id}",
+            token,
+            params={"fields": "async_status,async_percent_completion"},
+        )
+        async_status = status.get("async_status")
+        if async_status == "Job Completed":
+            return report_run_id
+        if async_status in ("Job Failed", "Job Skipped"):
+            raise RuntimeError(f"Relatório assíncrono {report_run_id} terminou com status '{async_status}'.")
+        if time.monotonic() >= deadline:
+            raise RuntimeError(
+                f"Relatório assíncrono {report_run_id} não terminou em {ASYNC_REPORT_MAX_WAIT_SECONDS}s "
+                f"(último status '{async_status}')."
+            )
+        print(f"Relatório em processamento ({status.get('async_percent_completion', 0)}%)...")
+        time.sleep(ASYNC_REPORT_POLL_SECONDS)
+
+
+def list_ad_accounts(token: str, graph_version: str, cache_ttl: int = ACCOUNTS_CACHE_TTL) -> List[Dict]:
     data = meta_get(
         f"/{graph_version}/me/adaccounts",
         token,
@@ -86,15 +333,32 @@ def list_ad_accounts(token: str, graph_version: str) -> List[Dict]:
             "fields": "id,name,account_id,account_status,currency",
             "limit": 50,
         },
+        cache_ttl=cache_ttl,
     )
     return data.get("data", [])
 
 
+def campaign_from_row(row: Dict) -> CampaignMetrics:
+    leads, purchases, purchase_value = split_actions(
+        row.get("actions"), row.get("action_values")
+    )
+    return CampaignMetrics(
+        campaign_name=row.get("campaign_name", "(sem nome)"),
+        spend=safe_float(row.get("spend")),
+        impressions=safe_int(row.get("impressions")),
+        clicks=safe_int(row.get("clicks")),
+        leads=leads,
+        purchases=purchases,
+        purchase_value=purchase_value,
+    )
+
+
 def fetch_campaign_insights(
     token: str,
     graph_version: str,
     ad_account_id: str,
     days: int,
+    cache_ttl: int = INSIGHTS_CACHE_TTL,
 ) -> List[CampaignMetrics]:
     today = date.today()
     since = today - timedelta(days=max(days - 1, 0))
@@ -103,82 +367,27 @@ def fetch_campaign_insights(
     params = {
         "level": "campaign",
         "time_increment": "all_days",
-        "fields": "campaign_name,spend,impressions,clicks,ctr,cpc,cpm,actions,action_values",
-        "time_range": json.dumps(time_range),
+        "fields": "campaign_name,spend,impressions,clicks,actions,action_values",
+        "time_range": orjson.dumps(time_range).decode(),
         "limit": 200,
     }
 
-    all_rows: List[Dict] = []
+    campaigns: List[CampaignMetrics] = []
     path = f"/{graph_version}/act_{ad_account_id}/insights"
-
+    if days > ASYNC_REPORT_MIN_DAYS:
+        report_run_id = run_async_insights_report(token, graph_version, ad_account_id, params)
+        path = f"/{graph_version}/{report_run_id}/insights"
+        params = {"limit": 500}
+        # Every run gets a new report_run_id, so its pages would never be read from cache again.
+        cache_ttl = 0
+
+    payload = meta_get(path, token, params=params, cache_ttl=cache_ttl)
     while True:
-        payload = meta_get(path, token, params=params)
-        all_rows.extend(payload.get("data", []))
-
-        paging = payload.get("paging", {})
-        next_url = paging.get("next")
+        campaigns.extend(map(campaign_from_row, payload.get("data", ())))
+        next_url = payload.get("paging", {}).get("next")
         if not next_url:
             break
-
-        response = requests.get(next_url, timeout=30)
-        if response.status_code >= 400:
-            raise RuntimeError(
-                f"Erro na paginação ({response.status_code}): {response.text}"
-            )
-        payload = response.json()
-        all_rows.extend(payload.get("data", []))
-
-        while payload.get("paging", {}).get("next"):
-            response = requests.get(payload["paging"]["next"], timeout=30)
-            if response.status_code >= 400:
-                raise RuntimeError(
-                    f"Erro na paginação ({response.status_code}): {response.text}"
-                )
-            payload = response.json()
-            all_rows.extend(payload.get("data", []))
-
-        break
-
-    campaigns: List[CampaignMetrics] = []
-    for row in all_rows:
-        actions = row.get("actions") or []
-        action_values = row.get("action_values") or []
-
-        campaigns.append(
-            CampaignMetrics(
-                campaign_name=row.get("campaign_name", "(sem nome)"),
-                spend=safe_float(row.get("spend")),
-                impressions=safe_int(row.get("impressions")),
-                clicks=safe_int(row.get("clicks")),
-                ctr=safe_float(row.get("ctr")),
-                cpc=safe_float(row.get("cpc")),
-                cpm=safe_float(row.get("cpm")),
-                leads=extract_action_value(
-                    actions,
-                    (
-                        "lead",
-                        "onsite_conversion.lead_grouped",
-                        "offsite_conversion.fb_pixel_lead",
-                    ),
-                ),
-                purchases=extract_action_value(
-                    actions,
-                    (
-                        "purchase",
-                        "offsite_conversion.fb_pixel_purchase",
-                        "omni_purchase",
-                    ),
-                ),
-                purchase_value=extract_action_value(
-                    action_values,
-                    (
-                        "purchase",
-                        "offsite_conversion.fb_pixel_purchase",
-                        "omni_purchase",
-                    ),
-                ),
-            )
-        )
+        payload = meta_get_next(next_url, token, cache_ttl=cache_ttl)
 
     return campaigns
 
@@ -189,12 +398,35 @@ def generate_insights(campaigns: List[CampaignMetrics]) -> List[str]:
 
     insights: List[str] = []
 
-    total_spend = sum(c.spend for c in campaigns)
-    total_impressions = sum(c.impressions for c in campaigns)
-    total_clicks = sum(c.clicks for c in campaigns)
-    total_leads = sum(c.leads for c in campaigns)
-    total_purchases = sum(c.purchases for c in campaigns)
-    total_revenue = sum(c.purchase_value for c in campaigns)
+    total_spend = 0.0
+    total_impressions = 0
+    total_clicks = 0
+    total_leads = 0.0
+    total_purchases = 0.0
+    total_revenue = 0.0
+    lead: Optional[CampaignMetrics] = None
+    best_ctr: Optional[CampaignMetrics] = None
+    valid_cpc: List[float] = []
+    low_ctr: List[CampaignMetrics] = []
+
+    for c in campaigns:
+        total_spend += c.spend
+        total_impressions += c.impressions
+        total_clicks += c.clicks
+        total_leads += c.leads
+        total_purchases += c.purchases
+        total_revenue += c.purchase_value
+        if lead is None or c.spend > lead.spend:
+            lead = c
+        if c.impressions >= 1000:
+            ctr = c.ctr
+            if best_ctr is None or ctr > best_ctr.ctr:
+                best_ctr = c
+            if ctr < 1.0 and len(low_ctr) < 3:
+                low_ctr.append(c)
+        cpc = c.cpc
+        if cpc > 0:
+            valid_cpc.append(cpc)
 
     overall_ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
     overall_cpc = (total_spend / total_clicks) if total_clicks > 0 else 0
@@ -203,34 +435,31 @@ def generate_insights(campaigns: List[CampaignMetrics]) -> List[str]:
         f"Resumo: gasto total {total_spend:.2f}, impressões {total_impressions}, cliques {total_clicks}, CTR médio {overall_ctr:.2f}%, CPC médio {overall_cpc:.2f}."
     )
 
-    top_spend = sorted(campaigns, key=lambda c: c.spend, reverse=True)
-    if top_spend and total_spend > 0:
-        lead = top_spend[0]
+    if lead is not None and total_spend > 0:
         share = lead.spend / total_spend * 100
         insights.append(
             f"Maior concentração de verba: '{lead.campaign_name}' consumiu {share:.1f}% do investimento ({lead.spend:.2f})."
         )
 
-    high_volume = [c for c in campaigns if c.impressions >= 1000]
-    if high_volume:
-        best_ctr = max(high_volume, key=lambda c: c.ctr)
+    if best_ctr is not None:
         insights.append(
             f"Melhor CTR (com >=1000 impressões): '{best_ctr.campaign_name}' com {best_ctr.ctr:.2f}%."
         )
 
-    valid_cpc = [c.cpc for c in campaigns if c.cpc > 0]
     if valid_cpc:
         median_cpc = statistics.median(valid_cpc)
-        expensive = [c for c in campaigns if c.cpc > median_cpc * 1.5 and c.clicks >= 20]
+        cpc_limit = median_cpc * 1.5
+        expensive = list(
+            islice((c for c in campaigns if c.cpc > cpc_limit and c.clicks >= 20), 3)
+        )
         if expensive:
-            names = ", ".join(f"{c.campaign_name} ({c.cpc:.2f})" for c in expensive[:3])
+            names = ", ".join(f"{c.campaign_name} ({c.cpc:.2f})" for c in expensive)
             insights.append(
                 f"Campanhas com CPC acima do esperado (>{median_cpc*1.5:.2f}): {names}."
             )
 
-    low_ctr = [c for c in campaigns if c.impressions >= 1000 and c.ctr < 1.0]
     if low_ctr:
-        names = ", ".join(f"{c.campaign_name} ({c.ctr:.2f}%)" for c in low_ctr[:3])
+        names = ", ".join(f"{c.campaign_name} ({c.ctr:.2f}%)" for c in low_ctr)
         insights.append(
             f"CTR baixo (<1.0%) em campanhas relevantes: {names}. Considere trocar criativo/gancho e segmentação."
         )
@@ -269,10 +498,10 @@ def print_table(campaigns: List[CampaignMetrics], limit: int = 10) -> None:
         "Compras",
         "ROAS",
     ]
-    print("\n" + " | ".join(headers))
-    print("-" * 120)
-    for c in sorted(campaigns, key=lambda x: x.spend, reverse=True)[:limit]:
-        roas = f"{c.roas:.2f}" if c.roas is not None else "-"
+    lines = ["", " | ".join(headers), "-" * 120]
+    for c in heapq.nlargest(limit, campaigns, key=lambda x: x.spend):
+        roas_value = c.roas
+        roas = f"{roas_value:.2f}" if roas_value is not None else "-"
         row = [
             c.campaign_name,
             f"{c.spend:.2f}",
@@ -285,7 +514,9 @@ def print_table(campaigns: List[CampaignMetrics], limit: int = 10) -> None:
             f"{c.purchases:.0f}",
             roas,
         ]
-        print(" | ".join(row))
+        lines.append(" | ".join(row))
+    lines.append("")
+    sys.stdout.write("\n".join(lines))
 
 
 def main() -> None:
@@ -307,6 +538,11 @@ def main() -> None:
         default=10,
         help="Quantidade de campanhas para mostrar na tabela.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignora o cache local de respostas da Graph API.",
+    )
     args = parser.parse_args()
 
     token = os.getenv("META_ACCESS_TOKEN", "").strip()
@@ -317,7 +553,9 @@ def main() -> None:
 
     ad_account_id = args.account_id
     if not ad_account_id:
-        accounts = list_ad_accounts(token, graph_version)
+        accounts = list_ad_accounts(
+            token, graph_version, cache_ttl=0 if args.no_cache else ACCOUNTS_CACHE_TTL
+        )
         if not accounts:
             raise SystemExit("Nenhuma conta de anúncios encontrada para este token.")
         selected = accounts[0]
@@ -331,6 +569,7 @@ def main() -> None:
         graph_version=graph_version,
         ad_account_id=ad_account_id,
         days=args.days,
+        cache_ttl=0 if args.no_cache else INSIGHTS_CACHE_TTL,
     )
 
     print(f"\nConta: act_{ad_account_id} | Período: últimos {args.days} dias")
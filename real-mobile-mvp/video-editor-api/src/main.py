@@ -1,27 +1,85 @@
+import asyncio
+import atexit
+import bisect
 import contextlib
 import datetime as dt
+import functools
 import hashlib
+import hmac
+import itertools
 import json
+import mmap
 import os
+import queue
 import re
 import secrets
 import shutil
 import sqlite3
 import subprocess
+import sys
 import threading
 import time
 import traceback
 import uuid
-from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Any, Callable, Optional
 
-from fastapi import BackgroundTasks, FastAPI, File, Form, Header, HTTPException, Query, Request, UploadFile
+from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
 from pydantic import BaseModel, Field
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+try:
+    from blake3 import blake3
+except ImportError:  # pragma: no cover - optional faster content hash
+    blake3 = None
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:  # pragma: no cover - optional in-process ASR
+    WhisperModel = None
+
+
+def json_dumps_bytes(value: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            # orjson rejects what the stdlib accepts: ints beyond 64 bits, lone surrogates, non-str keys.
+            pass
+    return json.dumps(value, ensure_ascii=True).encode("ascii")
+
+
+def json_dumps(value: Any) -> str:
+    return json_dumps_bytes(value).decode("utf-8")
+
+
+def json_loads(raw: Any) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # Escaped lone surrogates from the stdlib fallback above are valid JSON orjson will not decode.
+            pass
+    return json.loads(raw)
+
+
 APP_NAME = "video-editor-api"
 BASE_DIR = Path(__file__).resolve().parents[1]
 STORAGE_ROOT = Path(os.getenv("VIDEO_STORAGE_ROOT", BASE_DIR / "storage")).resolve()
@@ -35,17 +93,39 @@ EDITOR_DIR = Path(os.getenv("VIDEO_EDITOR_WEB_DIR", BASE_DIR / "editor")).resolv
 PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://localhost:8081").rstrip("/")
 INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY", "")
 MAX_WORKERS = int(os.getenv("VIDEO_MAX_WORKERS", "2"))
+SEGMENT_WORKERS = int(os.getenv("VIDEO_SEGMENT_WORKERS", str(min(os.cpu_count() or 1, 8))))
+# Parallel segment extraction runs SEGMENT_WORKERS ffmpeg processes at once; split the cores between them.
+SEGMENT_THREADS = max(1, (os.cpu_count() or 4) // max(1, SEGMENT_WORKERS))
 VIDEO_EDITOR_MANUAL_ENABLED = os.getenv("VIDEO_EDITOR_MANUAL_ENABLED", "true").lower() == "true"
 INCIDENT_WINDOW_MIN = int(os.getenv("INCIDENT_WINDOW_MIN", "15"))
 INCIDENT_RESET_MIN = int(os.getenv("INCIDENT_RESET_MIN", "30"))
 INCIDENT_L1 = int(os.getenv("INCIDENT_L1", "3"))
 INCIDENT_L2 = int(os.getenv("INCIDENT_L2", "5"))
 INCIDENT_L3 = int(os.getenv("INCIDENT_L3", "8"))
+VIDEO_NVENC = os.getenv("VIDEO_NVENC", "auto").lower()
+VIDEO_ENCODER = os.getenv("VIDEO_ENCODER", "auto").lower()
+LOG_STDOUT = os.getenv("LOG_STDOUT", "1").lower() not in {"0", "false", "no"}
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8_float16")
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "1").lower() not in {"0", "false", "no"}
+DB_READER_POOL_SIZE = int(os.getenv("VIDEO_DB_READERS", str(max(4, os.cpu_count() or 1))))
+DB_OPTIMIZE_INTERVAL_SEC = int(os.getenv("VIDEO_DB_OPTIMIZE_INTERVAL_SEC", "900"))
 
 for d in [INPUT_DIR, WORK_DIR, OUTPUT_DIR, LOGS_DIR, INCIDENTS_DIR, EDITOR_DIR]:
     d.mkdir(parents=True, exist_ok=True)
 
-app = FastAPI(title=APP_NAME, version="1.0.0")
+
+@contextlib.asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Load the whisper model when the server starts, off the request path, so the first caption job
+    # does not pay for it; plain imports (tests, tools, reload parents) never trigger the load.
+    if WhisperModel is not None and WHISPER_PRELOAD:
+        threading.Thread(target=preload_whisper_model, name="whisper-preload", daemon=True).start()
+    yield
+
+
+app = FastAPI(title=APP_NAME, version="1.0.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -55,21 +135,124 @@ app.add_middleware(
 )
 
 executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+segment_executor = ThreadPoolExecutor(max_workers=SEGMENT_WORKERS, thread_name_prefix="segment")
+cleanup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cleanup")
+
+
+def discard_dir(path: Path):
+    """Remove a scratch directory in the background so cleanup never delays the pipeline."""
+    cleanup_executor.submit(shutil.rmtree, path, ignore_errors=True)
+
+
+FICLONE = 0x40049409
+
+
+def clone_file(src: Path | str, dst: Path):
+    """Copy src to dst as cheaply as the filesystem allows: reflink, then hardlink, then a byte copy.
+
+    The copy is made under a temp name and renamed over dst, so an existing dst (possibly a hardlink
+    of src) is replaced rather than truncated. A hardlink shares the inode, so it is only safe while
+    neither path is rewritten in place."""
+    dst = Path(dst)
+    tmp = dst.with_name(f".{dst.stem}.{uuid.uuid4().hex[:8]}.part{dst.suffix}")
+    try:
+        cloned = False
+        if fcntl is not None:
+            try:
+                with open(src, "rb") as fin, open(tmp, "wb") as fout:
+                    fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+                cloned = True
+            except OSError:
+                with contextlib.suppress(FileNotFoundError):
+                    tmp.unlink()
+        if not cloned:
+            try:
+                os.link(src, tmp)
+            except OSError:
+                shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            tmp.unlink()
+
+
 active_futures: dict[str, Any] = {}
 active_lock = threading.Lock()
 
 
+def editor_token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 class Db:
-    def __init__(self, path: Path):
+    def __init__(self, path: Path, readers: int = DB_READER_POOL_SIZE):
         self.path = path
+        self.in_memory = path.name == ":memory:"
         self.lock = threading.Lock()
-        self.conn = sqlite3.connect(path.as_posix(), check_same_thread=False)
+        # Autocommit: single statements commit on their own and multi-statement writes go through
+        # transaction(), which takes the write lock up front with BEGIN IMMEDIATE instead of relying on
+        # sqlite3's implicit deferred BEGIN (whose lock upgrade can fail with "database is locked").
+        self.conn = sqlite3.connect(
+            ":memory:" if self.in_memory else path.as_posix(),
+            check_same_thread=False,
+            cached_statements=256,
+            isolation_level=None,
+        )
         self.conn.row_factory = sqlite3.Row
+        self._optimizer_stop = threading.Event()
         self._init()
+        # An in-memory database is private to its connection, so reads stay on the writer.
+        self._readers: Optional[queue.Queue] = None
+        if not self.in_memory and readers > 0:
+            self._readers = queue.Queue()
+            for _ in range(readers):
+                self._readers.put(self._open_reader())
+
+    def _open_reader(self) -> sqlite3.Connection:
+        # mode=ro makes the read-only contract part of the connection rather than a pragma.
+        conn = sqlite3.connect(
+            f"{self.path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-20000")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextlib.contextmanager
+    def reader(self):
+        if self._readers is None:
+            with self.lock:
+                yield self.conn
+            return
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def _apply_pragmas(self, c: sqlite3.Cursor):
+        # WAL lets readers run alongside the incident writer; NORMAL sync is durable under WAL
+        # except for the last commits on power loss, which is fine for this state.
+        if not self.in_memory:
+            c.execute("PRAGMA journal_mode=WAL")
+            # Truncate the -wal file back to this size after checkpoints instead of letting it keep
+            # its high-water mark from a burst of progress/incident writes.
+            c.execute("PRAGMA journal_size_limit=67108864")
+        c.execute("PRAGMA synchronous=NORMAL")
+        c.execute("PRAGMA temp_store=MEMORY")
+        c.execute("PRAGMA mmap_size=268435456")
+        c.execute("PRAGMA cache_size=-20000")
+        c.execute("PRAGMA busy_timeout=5000")
 
     def _init(self):
         with self.lock:
             c = self.conn.cursor()
+            self._apply_pragmas(c)
             c.execute(
                 """
                 create table if not exists videos (
@@ -120,10 +303,12 @@ class Db:
                   created_at text not null,
                   expires_at text not null,
                   last_used_at text,
-                  metadata_json text
+                  metadata_json text,
+                  token_hash text
                 )
                 """
             )
+            self._migrate_editor_sessions(c)
             c.execute(
                 """
                 create table if not exists incident_events (
@@ -164,29 +349,96 @@ class Db:
                 )
                 """
             )
-            self.conn.commit()
+            c.execute("create index if not exists idx_incident_states_last_seen on incident_states (last_seen_at)")
+            # Bounded ANALYZE so the planner has stats for the incident indexes without scanning big tables.
+            c.execute("PRAGMA analysis_limit=400")
+            c.execute("ANALYZE")
+
+    def _migrate_editor_sessions(self, c: sqlite3.Cursor):
+        # Older databases stored the editor token in plaintext; hash those rows and blank the token.
+        columns = {row[1] for row in c.execute("PRAGMA table_info(editor_sessions)")}
+        if "token_hash" not in columns:
+            c.execute("alter table editor_sessions add column token_hash text")
+        legacy = c.execute("select id, token from editor_sessions where token_hash is null").fetchall()
+        if legacy:
+            c.execute("BEGIN IMMEDIATE")
+            c.executemany(
+                "update editor_sessions set token_hash = ?, token = '' where id = ?",
+                [(editor_token_hash(row["token"]), row["id"]) for row in legacy],
+            )
+            c.execute("COMMIT")
+        c.execute("create index if not exists idx_editor_sessions_token_hash on editor_sessions (token_hash)")
 
     def execute(self, sql: str, params: tuple = ()):
         with self.lock:
             cur = self.conn.cursor()
             cur.execute(sql, params)
-            self.conn.commit()
             return cur
 
-    def fetchone(self, sql: str, params: tuple = ()):
+    @contextlib.contextmanager
+    def transaction(self):
         with self.lock:
             cur = self.conn.cursor()
-            cur.execute(sql, params)
-            return cur.fetchone()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                yield cur
+            except BaseException:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+
+    def execute_many_tx(self, stmts: list[tuple[str, tuple]]):
+        with self.transaction() as cur:
+            for sql, params in stmts:
+                cur.execute(sql, params)
+        return cur
+
+    def execute_returning(self, sql: str, params: tuple = ()):
+        with self.transaction() as cur:
+            rows = cur.execute(sql, params).fetchall()
+        return rows[0] if rows else None
+
+    def fetchone(self, sql: str, params: tuple = ()):
+        with self.reader() as conn:
+            return conn.execute(sql, params).fetchone()
 
     def fetchall(self, sql: str, params: tuple = ()):
+        with self.reader() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    # Async handlers use these so sqlite never blocks the event loop.
+    async def aexecute(self, sql: str, params: tuple = ()):
+        return await run_in_threadpool(self.execute, sql, params)
+
+    async def afetchone(self, sql: str, params: tuple = ()):
+        return await run_in_threadpool(self.fetchone, sql, params)
+
+    async def afetchall(self, sql: str, params: tuple = ()):
+        return await run_in_threadpool(self.fetchall, sql, params)
+
+    def optimize(self):
         with self.lock:
-            cur = self.conn.cursor()
-            cur.execute(sql, params)
-            return cur.fetchall()
+            self.conn.execute("PRAGMA optimize")
+
+    def start_optimizer(self, interval_sec: int):
+        if interval_sec <= 0:
+            return
+
+        def loop():
+            while not self._optimizer_stop.wait(interval_sec):
+                try:
+                    self.optimize()
+                except sqlite3.Error:
+                    pass
+
+        threading.Thread(target=loop, name="db-optimize", daemon=True).start()
+
+    def stop_optimizer(self):
+        self._optimizer_stop.set()
 
 
 db = Db(DB_PATH)
+db.start_optimizer(DB_OPTIMIZE_INTERVAL_SEC)
 
 
 SENSITIVE_KEY_RE = re.compile(r"(token|password|passwd|pwd|cookie|authorization|secret|api[_-]?key)", re.IGNORECASE)
@@ -195,10 +447,27 @@ SENSITIVE_VALUE_PATTERNS = [
     re.compile(r"\bsk-[A-Za-z0-9]{8,}\b"),
     re.compile(r"\b(xox[pbars]-[A-Za-z0-9-]{8,})\b", re.IGNORECASE),
 ]
+# One alternation so redact_string makes a single pass; scoped flags keep each pattern's case rules.
+SENSITIVE_VALUE_RE = re.compile(
+    "|".join(
+        f"(?i:{p.pattern})" if p.flags & re.IGNORECASE else f"(?:{p.pattern})" for p in SENSITIVE_VALUE_PATTERNS
+    )
+)
+
+
+_now_iso_cache: tuple[int, str] = (-1, "")
 
 
 def now_iso() -> str:
-    return dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    # Logs and rows only carry whole seconds, so calls within the same second share one string.
+    global _now_iso_cache
+    sec = time.time_ns() // 1_000_000_000
+    cached_sec, cached = _now_iso_cache
+    if sec == cached_sec:
+        return cached
+    cached = "%04d-%02d-%02dT%02d:%02d:%02dZ" % time.gmtime(sec)[:6]
+    _now_iso_cache = (sec, cached)
+    return cached
 
 
 def now_dt_utc() -> dt.datetime:
@@ -233,10 +502,23 @@ def clip_text(value: Any, limit: int) -> str:
 
 
 def redact_string(raw: str) -> str:
-    out = raw
-    for pattern in SENSITIVE_VALUE_PATTERNS:
-        out = pattern.sub("***", out)
-    return out
+    return SENSITIVE_VALUE_RE.sub("***", raw)
+
+
+_redact_string_cached = functools.lru_cache(maxsize=4096)(redact_string)
+REDACT_CACHE_MAX_LEN = 512
+
+
+@functools.lru_cache(maxsize=1024)
+def is_sensitive_key(key: str) -> bool:
+    return SENSITIVE_KEY_RE.search(key) is not None
+
+
+def redact_value(raw: str) -> str:
+    # Log values repeat a lot (paths, stages, codecs); short ones are memoized, long ones are not worth keeping.
+    if len(raw) <= REDACT_CACHE_MAX_LEN:
+        return _redact_string_cached(raw)
+    return redact_string(raw)
 
 
 def redact_data(value: Any, key_hint: str = "", depth: int = 0) -> Any:
@@ -245,9 +527,9 @@ def redact_data(value: Any, key_hint: str = "", depth: int = 0) -> Any:
     if value is None:
         return None
     if isinstance(value, str):
-        if SENSITIVE_KEY_RE.search(key_hint):
+        if is_sensitive_key(key_hint):
             return "***"
-        return redact_string(value)[:16000]
+        return redact_value(value)[:16000]
     if isinstance(value, (int, float, bool)):
         return value
     if isinstance(value, list):
@@ -259,15 +541,21 @@ def redact_data(value: Any, key_hint: str = "", depth: int = 0) -> Any:
         for key, item in list(value.items())[:300]:
             redacted[str(key)] = redact_data(item, str(key), depth + 1)
         return redacted
-    return redact_string(str(value))[:16000]
+    return redact_value(str(value))[:16000]
+
+
+ERROR_TYPE_RES = (
+    re.compile(r"\b([A-Za-z]+(?:Error|Exception|Domain))\b"),
+    re.compile(r"^([A-Za-z][A-Za-z0-9_.-]{2,40})"),
+)
 
 
 def infer_error_type(message: str) -> str:
     text = (message or "").strip()
     if not text:
         return "UnknownError"
-    for pattern in [r"\b([A-Za-z]+(?:Error|Exception|Domain))\b", r"^([A-Za-z][A-Za-z0-9_.-]{2,40})"]:
-        matched = re.search(pattern, text)
+    for pattern in ERROR_TYPE_RES:
+        matched = pattern.search(text)
         if matched:
             return matched.group(1)[:80]
     return "ClientEventError"
@@ -284,6 +572,50 @@ def meta_lookup(meta: dict[str, Any], keys: list[str]) -> Optional[str]:
     return None
 
 
+PRIMARY_CONTEXT_KEYS: tuple[str, ...] = (
+    "stage",
+    "event",
+    "path",
+    "route",
+    "platform",
+    "source",
+    "reason",
+    "code",
+    "error_code",
+    "request_id",
+    "run_id",
+    "job_id",
+    "video_id",
+)
+_EMPTY_CONTEXT_VALUES = (None, "", [], {})
+
+
+INCIDENT_EVENT_INSERT_SQL = """
+    insert into incident_events (
+      fingerprint, level, count_15m, error_type, message, stack, context_json,
+      stage, event, trace_id, request_id, run_id, event_ts, report_path
+    ) values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+INCIDENT_STATE_UPSERT_SQL = """
+    insert into incident_states (
+      fingerprint, level, count_15m, first_seen_at, last_seen_at, reset_applied,
+      last_event_json, last_trace_id, last_request_id, last_run_id, report_path, updated_at
+    ) values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    on conflict(fingerprint) do update set
+      level = excluded.level,
+      count_15m = excluded.count_15m,
+      last_seen_at = excluded.last_seen_at,
+      reset_applied = excluded.reset_applied,
+      last_event_json = excluded.last_event_json,
+      last_trace_id = excluded.last_trace_id,
+      last_request_id = excluded.last_request_id,
+      last_run_id = excluded.last_run_id,
+      report_path = coalesce(excluded.report_path, incident_states.report_path),
+      updated_at = excluded.updated_at
+    """
+
+
 class IncidentManager:
     def __init__(
         self,
@@ -296,6 +628,11 @@ class IncidentManager:
         level_l2: int = 5,
         level_l3: int = 8,
         now_provider: Optional[Callable[[], dt.datetime]] = None,
+        async_reports: bool = False,
+        report_queue_size: int = 64,
+        async_writes: bool = False,
+        write_queue_size: int = 1024,
+        write_batch_size: int = 256,
     ):
         self.db = db_ref
         self.incidents_dir = incidents_dir
@@ -306,6 +643,79 @@ class IncidentManager:
         self.level_l3 = max(self.level_l2, int(level_l3))
         self.now_provider = now_provider
         self.incidents_dir.mkdir(parents=True, exist_ok=True)
+        self._windows: dict[str, deque[dt.datetime]] = {}
+        self._windows_lock = threading.Lock()
+        self._windows_pruned_at: Optional[dt.datetime] = None
+        self._warm_windows()
+        # With async_reports the markdown is written by a daemon thread so a slow disk never
+        # holds up the error path; when the queue is full the report is dropped and counted.
+        self.reports_dropped = 0
+        self._report_queue: Optional[queue.Queue] = None
+        if async_reports:
+            self._report_queue = queue.Queue(maxsize=max(1, int(report_queue_size)))
+            threading.Thread(target=self._report_worker, name="incident-reports", daemon=True).start()
+        # With async_writes the event/state rows are committed by one writer thread, up to
+        # write_batch_size registrations per transaction. States still waiting for that thread
+        # are kept in _pending_states so register() never reads a stale row; when the queue is
+        # full the write falls back to the caller's thread instead of being dropped.
+        self.write_batch_size = max(1, int(write_batch_size))
+        self.writes_failed = 0
+        self._pending_states: dict[str, dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        self._write_queue: Optional[queue.Queue] = None
+        if async_writes:
+            self._write_queue = queue.Queue(maxsize=max(1, int(write_queue_size)))
+            threading.Thread(target=self._write_worker, name="incident-writes", daemon=True).start()
+
+    def _warm_windows(self):
+        window_start = iso_from_dt(self._now_dt() - dt.timedelta(minutes=self.window_minutes))
+        rows = self.db.fetchall(
+            "select fingerprint, event_ts from incident_events where event_ts >= ? order by event_ts",
+            (window_start,),
+        )
+        with self._windows_lock:
+            for row in rows:
+                self._windows.setdefault(row["fingerprint"], deque()).append(parse_iso_utc(row["event_ts"]))
+
+    def _prune_windows(self, now: dt.datetime, window_start: dt.datetime):
+        # Caller holds _windows_lock. Fingerprints that never fire again are only ever dropped here,
+        # so sweep every key once per window length instead of keeping them for the process lifetime.
+        if self._windows_pruned_at is not None and now - self._windows_pruned_at < dt.timedelta(minutes=self.window_minutes):
+            return
+        self._windows_pruned_at = now
+        for fingerprint in [fp for fp, window in self._windows.items() if not window or window[-1] < window_start]:
+            del self._windows[fingerprint]
+
+    def _count_in_window(self, fingerprint: str, now: dt.datetime) -> int:
+        window_start = now - dt.timedelta(minutes=self.window_minutes)
+        with self._windows_lock:
+            self._prune_windows(now, window_start)
+            window = self._windows.setdefault(fingerprint, deque())
+            while window and window[0] < window_start:
+                window.popleft()
+            window.append(now)
+            return len(window)
+
+    def record_repeat(self, fingerprint: str) -> Optional[int]:
+        """Count another occurrence of a recently registered fingerprint in memory only.
+
+        Returns the new window count, or None when the occurrence would change the level
+        (or the fingerprint is unknown) and has to go through register() instead."""
+        now = self._now_dt()
+        window_start = now - dt.timedelta(minutes=self.window_minutes)
+        with self._windows_lock:
+            window = self._windows.get(fingerprint)
+            if window is None:
+                return None
+            while window and window[0] < window_start:
+                window.popleft()
+            if not window:
+                del self._windows[fingerprint]
+                return None
+            if self.level_from_count(len(window) + 1) != self.level_from_count(len(window)):
+                return None
+            window.append(now)
+            return len(window)
 
     def _now_dt(self) -> dt.datetime:
         if self.now_provider is None:
@@ -328,32 +738,12 @@ class IncidentManager:
         return 0
 
     def _primary_context(self, context: dict[str, Any]) -> dict[str, Any]:
-        keys = [
-            "stage",
-            "event",
-            "path",
-            "route",
-            "platform",
-            "source",
-            "reason",
-            "code",
-            "error_code",
-            "request_id",
-            "run_id",
-            "job_id",
-            "video_id",
-        ]
-        out: dict[str, Any] = {}
-        for key in keys:
-            value = context.get(key)
-            if value in (None, "", [], {}):
-                continue
-            out[key] = value
-        if out:
+        out = {key: value for key in PRIMARY_CONTEXT_KEYS if (value := context.get(key)) not in _EMPTY_CONTEXT_VALUES}
+        if out or not context:
             return out
-        for key in sorted(context.keys())[:8]:
-            value = context.get(key)
-            if value in (None, "", [], {}):
+        for key in itertools.islice(sorted(context), 8):
+            value = context[key]
+            if value in _EMPTY_CONTEXT_VALUES:
                 continue
             out[key] = value
         return out
@@ -363,8 +753,10 @@ class IncidentManager:
         safe_message = clip_text(message, 1600)
         safe_stack = clip_text(stack, 6000)
         primary = self._primary_context(context)
+        # Canonical (sorted-key JSON) and byte-for-byte the encoding stored fingerprints were made with;
+        # changing it would split recurring incidents across old and new fingerprints.
         raw = f"{safe_type}|{safe_message}|{safe_stack}|{json.dumps(primary, sort_keys=True, ensure_ascii=True)}"
-        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+        return hashlib.sha256(raw.encode("utf-8", "surrogatepass")).hexdigest()[:24]
 
     def _impact_for_level(self, level: int) -> str:
         if level >= 3:
@@ -385,6 +777,104 @@ class IncidentManager:
             return clip_text(reason, 800)
         return "Sem detalhes adicionais de tentativas."
 
+    def _report_worker(self):
+        while True:
+            item = self._report_queue.get()
+            try:
+                if isinstance(item, threading.Event):
+                    item.set()
+                    continue
+                path, body = item
+                with contextlib.suppress(OSError):
+                    path.write_text(body, encoding="utf-8")
+            finally:
+                self._report_queue.task_done()
+
+    def flush_reports(self, timeout: float = 2.0):
+        if self._report_queue is None:
+            return
+        marker = threading.Event()
+        with contextlib.suppress(queue.Full):
+            self._report_queue.put(marker, timeout=timeout)
+            marker.wait(timeout)
+
+    def _write_worker(self):
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < self.write_batch_size:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            writes = [item for item in batch if not isinstance(item, threading.Event)]
+            try:
+                if writes:
+                    try:
+                        self._commit_writes(writes)
+                    except Exception as error:
+                        # The writer must outlive any failure, or pending states and flush markers never clear.
+                        self.writes_failed += len(writes)
+                        with contextlib.suppress(Exception):
+                            log_event("error", "incident-writes", "incidents", "write_worker_failed", error=str(error), batch_size=len(writes))
+                    with self._pending_lock:
+                        for _, fingerprint, state in writes:
+                            if self._pending_states.get(fingerprint) is state:
+                                del self._pending_states[fingerprint]
+            finally:
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                    self._write_queue.task_done()
+
+    def _commit_writes(self, writes: list[tuple[list[tuple[str, tuple]], str, dict[str, Any]]]):
+        try:
+            self.db.execute_many_tx([stmt for stmts, _, _ in writes for stmt in stmts])
+            return
+        except Exception as error:
+            # One bad or locked moment must not cost the whole batch: retry each registration on its own.
+            log_event("warn", "incident-writes", "incidents", "batch_write_failed", error=str(error), batch_size=len(writes))
+        for stmts, fingerprint, _ in writes:
+            try:
+                self.db.execute_many_tx(stmts)
+            except Exception as error:
+                self.writes_failed += 1
+                log_event("error", "incident-writes", "incidents", "incident_write_failed", error=str(error), fingerprint=fingerprint)
+
+    def flush_writes(self, timeout: float = 5.0):
+        if self._write_queue is None:
+            return
+        marker = threading.Event()
+        with contextlib.suppress(queue.Full):
+            self._write_queue.put(marker, timeout=timeout)
+            marker.wait(timeout)
+
+    def _persist_state(self, fingerprint: str, state: dict[str, Any], stmts: list[tuple[str, tuple]]):
+        if self._write_queue is not None:
+            with self._pending_lock:
+                self._pending_states[fingerprint] = state
+            try:
+                self._write_queue.put_nowait((stmts, fingerprint, state))
+                return
+            except queue.Full:
+                pass
+        self.db.execute_many_tx(stmts)
+
+    def _previous_state(self, fingerprint: str):
+        with self._pending_lock:
+            pending = self._pending_states.get(fingerprint)
+        if pending is not None:
+            return pending
+        return self.db.fetchone("select * from incident_states where fingerprint = ?", (fingerprint,))
+
+    def _persist_report(self, path: Path, body: str):
+        if self._report_queue is None:
+            path.write_text(body, encoding="utf-8")
+            return
+        try:
+            self._report_queue.put_nowait((path, body))
+        except queue.Full:
+            self.reports_dropped += 1
+
     def _write_report(
         self,
         *,
@@ -434,7 +924,7 @@ class IncidentManager:
                     "```",
                 ]
             )
-        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self._persist_report(path, "\n".join(lines) + "\n")
         return path.as_posix()
 
     def register(
@@ -464,21 +954,16 @@ class IncidentManager:
         safe_event = clip_text(event, 160)
         fingerprint = self.fingerprint(safe_type, safe_message, safe_stack, safe_context)
 
-        prev = self.db.fetchone("select * from incident_states where fingerprint = ?", (fingerprint,))
+        prev = self._previous_state(fingerprint)
         reset_applied = False
         if prev:
             last_seen = parse_iso_utc(prev["last_seen_at"])
             if (now - last_seen) >= dt.timedelta(minutes=self.reset_minutes):
                 reset_applied = True
 
-        window_start = iso_from_dt(now - dt.timedelta(minutes=self.window_minutes))
-        count_row = self.db.fetchone(
-            "select count(1) as c from incident_events where fingerprint = ? and event_ts >= ?",
-            (fingerprint, window_start),
-        )
-        count_15m = int((count_row["c"] if count_row and count_row["c"] is not None else 0)) + 1
+        count_15m = self._count_in_window(fingerprint, now)
         level = self.level_from_count(count_15m)
-        prev_level = int(prev["level"]) if prev else 0
+        prev_level = int(prev["level"]) if prev and not reset_applied else 0
 
         report_path = prev["report_path"] if prev and prev["report_path"] else None
         if level >= 2 and (prev_level < 2 or (prev_level < 3 and level >= 3) or not report_path):
@@ -495,13 +980,8 @@ class IncidentManager:
                 run_id=safe_run,
             )
 
-        self.db.execute(
-            """
-            insert into incident_events (
-              fingerprint, level, count_15m, error_type, message, stack, context_json,
-              stage, event, trace_id, request_id, run_id, event_ts, report_path
-            ) values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        event_stmt = (
+            INCIDENT_EVENT_INSERT_SQL,
             (
                 fingerprint,
                 level,
@@ -509,7 +989,7 @@ class IncidentManager:
                 safe_type,
                 safe_message,
                 safe_stack,
-                json.dumps(safe_context, ensure_ascii=True),
+                json_dumps(safe_context),
                 safe_stage,
                 safe_event,
                 safe_trace,
@@ -530,24 +1010,8 @@ class IncidentManager:
             "count_15m": count_15m,
             "ts": now_str,
         }
-        self.db.execute(
-            """
-            insert into incident_states (
-              fingerprint, level, count_15m, first_seen_at, last_seen_at, reset_applied,
-              last_event_json, last_trace_id, last_request_id, last_run_id, report_path, updated_at
-            ) values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            on conflict(fingerprint) do update set
-              level = excluded.level,
-              count_15m = excluded.count_15m,
-              last_seen_at = excluded.last_seen_at,
-              reset_applied = excluded.reset_applied,
-              last_event_json = excluded.last_event_json,
-              last_trace_id = excluded.last_trace_id,
-              last_request_id = excluded.last_request_id,
-              last_run_id = excluded.last_run_id,
-              report_path = coalesce(excluded.report_path, incident_states.report_path),
-              updated_at = excluded.updated_at
-            """,
+        state_stmt = (
+            INCIDENT_STATE_UPSERT_SQL,
             (
                 fingerprint,
                 level,
@@ -555,7 +1019,7 @@ class IncidentManager:
                 first_seen,
                 now_str,
                 1 if reset_applied else 0,
-                json.dumps(last_event, ensure_ascii=True),
+                json_dumps(last_event),
                 safe_trace,
                 safe_request,
                 safe_run,
@@ -563,6 +1027,11 @@ class IncidentManager:
                 now_str,
             ),
         )
+        self._persist_state(
+            fingerprint,
+            {"level": level, "first_seen_at": first_seen, "last_seen_at": now_str, "report_path": report_path},
+            [event_stmt, state_stmt],
+        )
         return {
             "incident_fingerprint": fingerprint,
             "incident_level": level,
@@ -573,26 +1042,13 @@ class IncidentManager:
             "last_trace_id": safe_trace,
         }
 
-    def _apply_stale_resets(self):
-        now = self._now_dt()
-        cutoff = iso_from_dt(now - dt.timedelta(minutes=self.reset_minutes))
-        now_str = iso_from_dt(now)
-        self.db.execute(
-            """
-            update incident_states
-            set level = 0,
-                count_15m = 0,
-                reset_applied = 1,
-                updated_at = ?
-            where level > 0 and last_seen_at < ?
-            """,
-            (now_str, cutoff),
-        )
-
     def tail(self, *, limit: int, fingerprint: Optional[str] = None, min_level: int = 0) -> list[dict[str, Any]]:
-        self._apply_stale_resets()
+        # Stale states are reported as reset at read time instead of being rewritten on every poll;
+        # register() applies the reset for real when the fingerprint fires again.
+        self.flush_writes()
+        cutoff = iso_from_dt(self._now_dt() - dt.timedelta(minutes=self.reset_minutes))
         clauses = ["1 = 1"]
-        params: list[Any] = []
+        params: list[Any] = [cutoff, cutoff, cutoff]
         if fingerprint:
             clauses.append("fingerprint = ?")
             params.append(fingerprint)
@@ -601,7 +1057,25 @@ class IncidentManager:
             params.append(int(min_level))
         params.append(int(limit))
         rows = self.db.fetchall(
-            f"select * from incident_states where {' and '.join(clauses)} order by last_seen_at desc limit ?",
+            f"""
+            select * from (
+              select
+                fingerprint,
+                case when level > 0 and last_seen_at < ? then 0 else level end as level,
+                case when level > 0 and last_seen_at < ? then 0 else count_15m end as count_15m,
+                case when level > 0 and last_seen_at < ? then 1 else reset_applied end as reset_applied,
+                last_seen_at,
+                last_event_json,
+                last_trace_id,
+                last_request_id,
+                last_run_id,
+                report_path
+              from incident_states
+            )
+            where {' and '.join(clauses)}
+            order by last_seen_at desc
+            limit ?
+            """,
             tuple(params),
         )
         out: list[dict[str, Any]] = []
@@ -609,7 +1083,7 @@ class IncidentManager:
             last_event = {}
             if row["last_event_json"]:
                 with contextlib.suppress(Exception):
-                    last_event = json.loads(row["last_event_json"])
+                    last_event = json_loads(row["last_event_json"])
             out.append(
                 {
                     "fingerprint": row["fingerprint"],
@@ -635,15 +1109,64 @@ incident_manager = IncidentManager(
     level_l1=INCIDENT_L1,
     level_l2=INCIDENT_L2,
     level_l3=INCIDENT_L3,
+    async_reports=True,
+    async_writes=True,
 )
+atexit.register(incident_manager.flush_reports)
+atexit.register(incident_manager.flush_writes)
+
+
+def short_digest(h: Any) -> str:
+    return h.hexdigest()[:12]
+
+
+def content_hasher() -> Any:
+    """Hasher for the 12-char content ids in logs: BLAKE3 (multithreaded) when installed, else sha256."""
+    if blake3 is not None:
+        return blake3(max_threads=blake3.AUTO)
+    return hashlib.sha256()
+
+
+SHORT_HASH_CACHE_SIZE = 1024
+_short_hash_cache: OrderedDict[tuple[int, int, int, int], str] = OrderedDict()
+_short_hash_cache_lock = threading.Lock()
 
 
 def short_hash(path: Path) -> str:
+    """12-char content id, cached per (device, inode, size, mtime_ns) so an unchanged file is read once."""
+    with path.open("rb", buffering=0) as f:
+        st = os.fstat(f.fileno())
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        with _short_hash_cache_lock:
+            cached = _short_hash_cache.get(key)
+            if cached is not None:
+                _short_hash_cache.move_to_end(key)
+                return cached
+        digest = _hash_file(f)
+    with _short_hash_cache_lock:
+        _short_hash_cache[key] = digest
+        while len(_short_hash_cache) > SHORT_HASH_CACHE_SIZE:
+            _short_hash_cache.popitem(last=False)
+    return digest
+
+
+def _hash_file(f: Any) -> str:
+    if blake3 is not None:
+        h = content_hasher()
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        return short_digest(h)
+    if hasattr(hashlib, "file_digest"):
+        return short_digest(hashlib.file_digest(f, "sha256"))
     h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()[:12]
+    buf = memoryview(bytearray(4 * 1024 * 1024))
+    while True:
+        n = f.readinto(buf)
+        if not n:
+            break
+        h.update(buf[:n])
+    return short_digest(h)
 
 
 def request_trace_id(request: Request) -> str:
@@ -653,16 +1176,90 @@ def request_trace_id(request: Request) -> str:
     return f"trace_{uuid.uuid4().hex[:16]}"
 
 
+class LogFileWriter:
+    """Appends JSONL lines to the daily log file from a single background thread."""
+
+    def __init__(self, logs_dir: Path, batch_size: int = 256):
+        self.logs_dir = logs_dir
+        self.batch_size = batch_size
+        self.queue: queue.Queue = queue.Queue()
+        self._handles: dict[str, Any] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def write(self, date: str, line: bytes):
+        self._ensure_thread()
+        self.queue.put((date, line))
+
+    def flush(self, timeout: float = 2.0):
+        if self._thread is None:
+            return
+        marker = threading.Event()
+        self.queue.put(marker)
+        marker.wait(timeout)
+
+    def _handle(self, date: str):
+        handle = self._handles.get(date)
+        if handle is None:
+            # The day rolled over: close older files so only the current one stays open.
+            for old in self._handles.values():
+                with contextlib.suppress(Exception):
+                    old.close()
+            self._handles.clear()
+            out = self.logs_dir / f"video-editor-api-{date}.jsonl"
+            handle = out.open("ab", buffering=1 << 16)
+            self._handles[date] = handle
+        return handle
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            markers = []
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                    continue
+                date, line = item
+                with contextlib.suppress(Exception):
+                    self._handle(date).write(line)
+            for handle in self._handles.values():
+                with contextlib.suppress(Exception):
+                    handle.flush()
+            for marker in markers:
+                marker.set()
+
+
+log_writer = LogFileWriter(LOGS_DIR)
+atexit.register(log_writer.flush)
+
+
 def write_log(entry: dict[str, Any]):
     ts = now_iso()
     payload_raw: dict[str, Any] = {"ts": ts, "app": APP_NAME, **entry}
     payload_safe = redact_data(payload_raw, "root")
     payload = payload_safe if isinstance(payload_safe, dict) else payload_raw
-    date = ts[:10]
-    out = LOGS_DIR / f"video-editor-api-{date}.jsonl"
-    with out.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(payload, ensure_ascii=True) + "\n")
-    print(json.dumps(payload, ensure_ascii=True))
+    line = json_dumps_bytes(payload) + b"\n"
+    log_writer.write(ts[:10], line)
+    if LOG_STDOUT:
+        out = getattr(sys.stdout, "buffer", None)
+        if out is not None:
+            out.write(line)
+            out.flush()
+        else:
+            sys.stdout.write(line.decode("utf-8"))
 
 
 def log_event(level: str, trace_id: str, stage: str, event: str, **meta):
@@ -741,7 +1338,7 @@ def job_row_to_item(row: sqlite3.Row) -> dict[str, Any]:
     result = {}
     if row["result_json"]:
         with contextlib.suppress(Exception):
-            result = json.loads(row["result_json"])
+            result = json_loads(row["result_json"])
     return {
         "job_id": row["id"],
         "status": row["status"],
@@ -753,10 +1350,17 @@ def job_row_to_item(row: sqlite3.Row) -> dict[str, Any]:
     }
 
 
-def run_cmd(cmd: list[str], trace_id: str, stage: str, video_id: Optional[str] = None, job_id: Optional[str] = None):
-    started = time.time()
-    log_event("info", trace_id, stage, "command_start", video_id=video_id, job_id=job_id, cmd=cmd)
-    proc = subprocess.run(cmd, capture_output=True, text=True)
+def _log_cmd_end(
+    cmd: list[str],
+    trace_id: str,
+    stage: str,
+    video_id: Optional[str],
+    job_id: Optional[str],
+    started: float,
+    returncode: int,
+    stdout: str,
+    stderr: str,
+):
     duration_ms = int((time.time() - started) * 1000)
     log_event(
         "info",
@@ -766,49 +1370,121 @@ def run_cmd(cmd: list[str], trace_id: str, stage: str, video_id: Optional[str] =
         video_id=video_id,
         job_id=job_id,
         cmd=cmd,
-        returncode=proc.returncode,
+        returncode=returncode,
         duration_ms=duration_ms,
-        stdout_tail=proc.stdout[-1200:],
-        stderr_tail=proc.stderr[-1200:],
+        stdout_tail=stdout[-1200:],
+        stderr_tail=stderr[-1200:],
     )
-    if proc.returncode != 0:
-        raise RuntimeError(f"command_failed:{stage}:{proc.returncode}:{proc.stderr[-300:]}")
+    if returncode != 0:
+        raise RuntimeError(f"command_failed:{stage}:{returncode}:{stderr[-300:]}")
+
+
+def run_cmd(cmd: list[str], trace_id: str, stage: str, video_id: Optional[str] = None, job_id: Optional[str] = None):
+    started = time.time()
+    log_event("info", trace_id, stage, "command_start", video_id=video_id, job_id=job_id, cmd=cmd)
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    _log_cmd_end(cmd, trace_id, stage, video_id, job_id, started, proc.returncode, proc.stdout, proc.stderr)
     return proc
 
 
-def ffprobe_duration(path: Path, trace_id: str, video_id: Optional[str] = None) -> float:
-    cmd = [
+async def arun_cmd(cmd: list[str], trace_id: str, stage: str, video_id: Optional[str] = None, job_id: Optional[str] = None):
+    """Async variant of run_cmd for request handlers; waits on the child without holding a thread."""
+    started = time.time()
+    log_event("info", trace_id, stage, "command_start", video_id=video_id, job_id=job_id, cmd=cmd)
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = await proc.communicate()
+    stdout = out.decode("utf-8", errors="replace")
+    stderr = err.decode("utf-8", errors="replace")
+    _log_cmd_end(cmd, trace_id, stage, video_id, job_id, started, proc.returncode, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+
+PROBE_CACHE_SIZE = 512
+_probe_cache: "OrderedDict[tuple[str, int, int], dict[str, Any]]" = OrderedDict()
+_probe_cache_lock = threading.Lock()
+
+
+def _probe_cmd(path: Path) -> list[str]:
+    return [
         "ffprobe",
         "-v",
         "error",
         "-show_entries",
-        "format=duration",
+        "format=duration:stream=index,codec_type,codec_name,channels,sample_rate,width,height,pix_fmt",
         "-of",
-        "default=noprint_wrappers=1:nokey=1",
+        "json",
         path.as_posix(),
     ]
-    proc = run_cmd(cmd, trace_id=trace_id, stage="ffprobe_duration", video_id=video_id)
+
+
+def _probe_key(path: Path) -> tuple[str, int, int]:
+    st = path.stat()
+    return (path.as_posix(), st.st_mtime_ns, st.st_size)
+
+
+def _probe_cache_get(key: tuple[str, int, int]) -> Optional[dict[str, Any]]:
+    with _probe_cache_lock:
+        payload = _probe_cache.get(key)
+        if payload is not None:
+            _probe_cache.move_to_end(key)
+        return payload
+
+
+def _probe_cache_put(key: tuple[str, int, int], stdout: str) -> dict[str, Any]:
+    payload = json_loads(stdout or "{}")
+    with _probe_cache_lock:
+        _probe_cache[key] = payload
+        while len(_probe_cache) > PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+    return payload
+
+
+def probe_media(path: Path, trace_id: str, stage: str, video_id: Optional[str] = None) -> dict[str, Any]:
+    """ffprobe format and streams once per (path, mtime, size); raises ValueError on unparsable output."""
+    key = _probe_key(path)
+    payload = _probe_cache_get(key)
+    if payload is None:
+        proc = run_cmd(_probe_cmd(path), trace_id=trace_id, stage=stage, video_id=video_id)
+        payload = _probe_cache_put(key, proc.stdout)
+    return payload
+
+
+async def aprobe_media(path: Path, trace_id: str, stage: str, video_id: Optional[str] = None) -> dict[str, Any]:
+    key = _probe_key(path)
+    payload = _probe_cache_get(key)
+    if payload is None:
+        proc = await arun_cmd(_probe_cmd(path), trace_id=trace_id, stage=stage, video_id=video_id)
+        payload = _probe_cache_put(key, proc.stdout)
+    return payload
+
+
+def _duration_from_probe(payload: dict[str, Any]) -> float:
     try:
-        return max(0.0, float(proc.stdout.strip()))
+        return max(0.0, float(payload["format"]["duration"]))
     except Exception as error:
         raise RuntimeError(f"ffprobe_parse_failed:{error}")
 
 
+def ffprobe_duration(path: Path, trace_id: str, video_id: Optional[str] = None) -> float:
+    try:
+        payload = probe_media(path, trace_id=trace_id, stage="ffprobe_duration", video_id=video_id)
+    except ValueError as error:
+        raise RuntimeError(f"ffprobe_parse_failed:{error}")
+    return _duration_from_probe(payload)
+
+
+async def affprobe_duration(path: Path, trace_id: str, video_id: Optional[str] = None) -> float:
+    try:
+        payload = await aprobe_media(path, trace_id=trace_id, stage="ffprobe_duration", video_id=video_id)
+    except ValueError as error:
+        raise RuntimeError(f"ffprobe_parse_failed:{error}")
+    return _duration_from_probe(payload)
+
+
 def log_media_streams(path: Path, trace_id: str, stage: str, event: str, video_id: Optional[str] = None):
-    cmd = [
-        "ffprobe",
-        "-v",
-        "error",
-        "-show_entries",
-        "stream=index,codec_type,codec_name,channels,sample_rate",
-        "-of",
-        "json",
-        path.as_posix(),
-    ]
-    proc = run_cmd(cmd, trace_id=trace_id, stage=f"{stage}_ffprobe_streams", video_id=video_id)
     try:
-        payload = json.loads(proc.stdout or "{}")
-    except Exception as error:
+        payload = probe_media(path, trace_id=trace_id, stage=f"{stage}_ffprobe_streams", video_id=video_id)
+    except ValueError as error:
         log_error(trace_id, stage, "streams_probe_parse_failed", error, video_id=video_id, path=path.as_posix())
         return
 
@@ -831,26 +1507,39 @@ def log_media_streams(path: Path, trace_id: str, stage: str, event: str, video_i
     )
 
 
-def parse_silences(stderr: str, total_duration: float, padding_before: float, padding_after: float, min_segment_duration: float):
+# Group 1 only matches for silence_start, so the same check works for the str and bytes patterns.
+SILENCE_RE = re.compile(r"silence_(?:(start)|end):\s*([0-9.]+)")
+SILENCE_BYTES_RE = re.compile(rb"silence_(?:(start)|end):\s*([0-9.]+)")
+
+
+def scan_silences(text: str | bytes, silence_starts: list[float], silence_ends: list[float]):
+    pattern = SILENCE_BYTES_RE if isinstance(text, bytes) else SILENCE_RE
+    for m in pattern.finditer(text):
+        (silence_starts if m.group(1) is not None else silence_ends).append(float(m.group(2)))
+
+
+def parse_silences(stderr: str | bytes, total_duration: float, padding_before: float, padding_after: float, min_segment_duration: float):
     silence_starts: list[float] = []
     silence_ends: list[float] = []
-    for line in stderr.splitlines():
-        m_start = re.search(r"silence_start:\s*([0-9.]+)", line)
-        if m_start:
-            silence_starts.append(float(m_start.group(1)))
-        m_end = re.search(r"silence_end:\s*([0-9.]+)", line)
-        if m_end:
-            silence_ends.append(float(m_end.group(1)))
-
-    silences: list[tuple[float, float]] = []
-    for i, st in enumerate(silence_starts):
-        en = silence_ends[i] if i < len(silence_ends) else total_duration
-        if en > st:
-            silences.append((st, en))
+    scan_silences(stderr, silence_starts, silence_ends)
+    return segments_from_silences(silence_starts, silence_ends, total_duration, padding_before, padding_after, min_segment_duration)
 
+
+def segments_from_silences(
+    silence_starts: list[float],
+    silence_ends: list[float],
+    total_duration: float,
+    padding_before: float,
+    padding_after: float,
+    min_segment_duration: float,
+) -> list[tuple[float, float]]:
+    # A trailing silence_start without its end runs to the end of the file.
+    ends = itertools.chain(silence_ends, itertools.repeat(total_duration))
     segments: list[tuple[float, float]] = []
     cursor = 0.0
-    for st, en in silences:
+    for st, en in zip(silence_starts, ends):
+        if en <= st:
+            continue
         seg_st = max(0.0, cursor - padding_before)
         seg_en = max(seg_st, st + padding_after)
         if seg_en - seg_st >= min_segment_duration:
@@ -868,6 +1557,121 @@ def parse_silences(stderr: str, total_duration: float, padding_before: float, pa
     return segments
 
 
+X264_ENCODE_ARGS = ("-c:v", "libx264", "-preset", "veryfast", "-crf", "23")
+NVENC_ENCODE_ARGS = ("-c:v", "h264_nvenc", "-preset", "p4", "-tune", "ll", "-rc", "vbr", "-cq", "23")
+# Extra surfaces keep the decoder from stalling when one input feeds several outputs.
+CUDA_DECODE_ARGS = ("-hwaccel", "cuda", "-hwaccel_output_format", "cuda", "-extra_hw_frames", "8")
+AV_MAP_ARGS = ("-map", "0:v:0", "-map", "0:a?")
+AAC_AUDIO_ARGS = ("-c:a", "aac", "-b:a", "128k")
+FASTSTART_ARGS = ("-movflags", "+faststart")
+
+
+# Encoders that take ordinary system-memory frames, so only the -c:v arguments change.
+# VAAPI is not offered: it needs hwupload/scale_vaapi threaded through every filtergraph.
+ENCODE_ARGS = {
+    "libx264": X264_ENCODE_ARGS,
+    "h264_nvenc": NVENC_ENCODE_ARGS,
+    "h264_qsv": ("-c:v", "h264_qsv", "-preset", "veryfast", "-global_quality", "23"),
+    "h264_videotoolbox": ("-c:v", "h264_videotoolbox", "-q:v", "65"),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def encoder_available(encoder: str) -> bool:
+    # `ffmpeg -encoders` lists hardware encoders even without usable hardware, so try a tiny real encode instead.
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        "color=c=black:s=256x256:d=0.1",
+        "-c:v",
+        encoder,
+        "-f",
+        "null",
+        "-",
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return proc.returncode == 0
+
+
+@functools.lru_cache(maxsize=1)
+def video_encoder() -> str:
+    """H.264 encoder for every output: VIDEO_ENCODER when it works here; with auto, NVENC when usable; else libx264."""
+    if VIDEO_ENCODER in ENCODE_ARGS:
+        return VIDEO_ENCODER if VIDEO_ENCODER == "libx264" or encoder_available(VIDEO_ENCODER) else "libx264"
+    if VIDEO_NVENC not in {"0", "off", "false", "no"} and encoder_available("h264_nvenc"):
+        return "h264_nvenc"
+    return "libx264"
+
+
+def nvenc_available() -> bool:
+    return video_encoder() == "h264_nvenc"
+
+
+def build_encode_args() -> tuple[str, ...]:
+    return ENCODE_ARGS[video_encoder()]
+
+
+def build_decode_args() -> tuple[str, ...]:
+    return CUDA_DECODE_ARGS if nvenc_available() else ()
+
+
+@functools.lru_cache(maxsize=None)
+def filter_thread_args(threads: int = 0) -> tuple[str, ...]:
+    # 0 lets ffmpeg size the filter thread pools to the host.
+    return ("-filter_threads", str(threads), "-filter_complex_threads", str(threads))
+
+
+@functools.lru_cache(maxsize=None)
+def av_output_args(threads: int = 0) -> tuple[str, ...]:
+    """Stream maps, encoders and muxer flags shared by every H.264/AAC output; built once per thread count."""
+    return (*AV_MAP_ARGS, *build_encode_args(), "-threads", str(threads), *AAC_AUDIO_ARGS, *FASTSTART_ARGS)
+
+
+# Run the encoder test encode at startup, off the request path, so the first job does not pay for it.
+threading.Thread(target=video_encoder, name="encoder-probe", daemon=True).start()
+
+
+CUT_NOOP_TOLERANCE_SEC = 0.05
+FFMPEG_DURATION_RE = re.compile(rb"Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+
+
+def parse_ffmpeg_duration(line: bytes) -> Optional[float]:
+    """Seconds from ffmpeg's "Duration: HH:MM:SS.xx" header line; None for N/A or no match."""
+    m = FFMPEG_DURATION_RE.search(line)
+    if m is None:
+        return None
+    return int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+
+
+def trim_concat_filter(segments: list[tuple[float, float]], has_audio: bool) -> str:
+    """filter_complex keeping segments via trim/atrim + concat, labelled [v] (and [a]).
+
+    Each range keeps its source timestamps (shifted to start at 0), so variable-frame-rate phone
+    footage stays in sync; a select+setpts=N/FRAME_RATE/TB rewrite would retime it as constant rate."""
+    n = len(segments)
+    parts = ["[0:v:0]split=" + str(n) + "".join(f"[vs{i}]" for i in range(n))]
+    if has_audio:
+        parts.append("[0:a:0]asplit=" + str(n) + "".join(f"[as{i}]" for i in range(n)))
+    inputs = []
+    for i, (st, en) in enumerate(segments):
+        parts.append(f"[vs{i}]trim=start={st:.3f}:end={en:.3f},setpts=PTS-STARTPTS[vt{i}]")
+        inputs.append(f"[vt{i}]")
+        if has_audio:
+            parts.append(f"[as{i}]atrim=start={st:.3f}:end={en:.3f},asetpts=PTS-STARTPTS[at{i}]")
+            inputs.append(f"[at{i}]")
+    outputs = "[v][a]" if has_audio else "[v]"
+    parts.append(f"{''.join(inputs)}concat=n={n}:v=1:a={1 if has_audio else 0}{outputs}")
+    return ";".join(parts)
+
+
 def auto_cut_video(
     input_path: Path,
     output_path: Path,
@@ -880,19 +1684,19 @@ def auto_cut_video(
     padding_after: float,
     min_segment_duration: float,
 ):
-    total_duration = ffprobe_duration(input_path, trace_id=trace_id, video_id=video_id)
     log_event(
         "info",
         trace_id,
         "silencedetect",
         "start",
         video_id=video_id,
-        total_duration_sec=round(total_duration, 3),
         silence_noise_db=silence_noise_db,
         silence_min_duration=silence_min_duration,
     )
     detect_cmd = [
         "ffmpeg",
+        "-hide_banner",
+        "-nostats",
         "-i",
         input_path.as_posix(),
         "-af",
@@ -903,20 +1707,50 @@ def auto_cut_video(
         "-y",
     ]
     started = time.time()
-    proc = subprocess.run(detect_cmd, capture_output=True, text=True)
+    # Parse stderr as it streams so long inputs never hold the whole silencedetect log in memory.
+    silence_starts: list[float] = []
+    silence_ends: list[float] = []
+    # Lines stay bytes; only the tail kept for the log is ever decoded.
+    stderr_tail: deque[bytes] = deque(maxlen=20)
+    # ffmpeg prints the input header (Duration, streams) before anything else, so the same pass
+    # stands in for an ffprobe spawn.
+    header_duration: Optional[float] = None
+    has_audio = False
+    in_header = True
+    with subprocess.Popen(detect_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) as proc:
+        for line in proc.stderr:
+            if in_header:
+                if line.startswith((b"Output #", b"Stream mapping:")):
+                    in_header = False
+                elif header_duration is None and b"Duration:" in line:
+                    header_duration = parse_ffmpeg_duration(line)
+                elif b"Stream #0:" in line and b": Audio:" in line:
+                    has_audio = True
+            if b"silence_" in line:
+                scan_silences(line, silence_starts, silence_ends)
+            stderr_tail.append(line)
+        returncode = proc.wait()
     duration_ms = int((time.time() - started) * 1000)
+    if header_duration is None:
+        total_duration = ffprobe_duration(input_path, trace_id=trace_id, video_id=video_id)
+        streams = probe_media(input_path, trace_id=trace_id, stage="segment_select_probe", video_id=video_id).get("streams") or []
+        has_audio = any(s.get("codec_type") == "audio" for s in streams)
+    else:
+        total_duration = header_duration
     log_event(
         "info",
         trace_id,
         "silencedetect",
         "finished",
         video_id=video_id,
-        returncode=proc.returncode,
+        returncode=returncode,
         duration_ms=duration_ms,
-        stderr_tail=proc.stderr[-1200:],
+        total_duration_sec=round(total_duration, 3),
+        duration_source="ffprobe" if header_duration is None else "stderr",
+        stderr_tail=b"".join(stderr_tail)[-1200:].decode("utf-8", "replace"),
     )
 
-    segments = parse_silences(proc.stderr, total_duration, padding_before, padding_after, min_segment_duration)
+    segments = segments_from_silences(silence_starts, silence_ends, total_duration, padding_before, padding_after, min_segment_duration)
     kept_duration = sum(max(0.0, en - st) for st, en in segments)
     reduction_pct = max(0.0, 100.0 * (1.0 - (kept_duration / total_duration))) if total_duration > 0 else 0.0
     log_event(
@@ -947,89 +1781,150 @@ def auto_cut_video(
         if clipped:
             segments = clipped
 
-    work_tmp = WORK_DIR / f"segments_{uuid.uuid4().hex[:10]}"
-    work_tmp.mkdir(parents=True, exist_ok=True)
-    segment_files: list[Path] = []
+    keeps_everything = len(segments) == 1 and segments[0][0] <= CUT_NOOP_TOLERANCE_SEC and segments[0][1] >= total_duration - CUT_NOOP_TOLERANCE_SEC
+    if not segments or keeps_everything:
+        # Nothing to cut. An H.264/AAC input only needs a stream-copy remux into a fresh faststart mp4;
+        # anything else is encoded whole so /jobs/auto-edit still returns the delivery codecs.
+        try:
+            payload = probe_media(input_path, trace_id=trace_id, stage="cut_skip_probe", video_id=video_id)
+        except ValueError:
+            payload = {}
+        if is_h264_aac(payload):
+            cmd = ["ffmpeg", "-y", "-i", input_path.as_posix(), *AV_MAP_ARGS, "-c", "copy", *FASTSTART_ARGS, output_path.as_posix()]
+            log_event("info", trace_id, "silencedetect", "cut_skipped", video_id=video_id, segment_count=len(segments))
+            run_cmd(cmd, trace_id=trace_id, stage="cut_skip_copy", video_id=video_id)
+            return
+        select_args = list(AV_MAP_ARGS)
+    else:
+        # One decode/encode pass over the kept ranges instead of cutting, re-encoding and concatenating each segment.
+        select_args = ["-filter_complex", trim_concat_filter(segments, has_audio), "-map", "[v]"]
+        if has_audio:
+            select_args += ["-map", "[a]"]
+    cmd = [
+        "ffmpeg",
+        "-y",
+        *filter_thread_args(),
+        "-i",
+        input_path.as_posix(),
+        *select_args,
+        # Keep the source frame timing instead of duplicating/dropping frames to a constant rate.
+        "-fps_mode",
+        "vfr",
+        *build_encode_args(),
+        "-threads",
+        "0",
+        *AAC_AUDIO_ARGS,
+        *FASTSTART_ARGS,
+        output_path.as_posix(),
+    ]
+    run_cmd(cmd, trace_id=trace_id, stage="segment_select_encode", video_id=video_id)
+    log_media_streams(output_path, trace_id=trace_id, stage="segment_select_encode", event="concat_streams", video_id=video_id)
+
+
+_whisper_model: Any = None
+_whisper_model_lock = threading.Lock()
 
+
+def get_whisper_model() -> Any:
+    """Load the faster-whisper model once per process; later calls reuse it."""
+    global _whisper_model
+    if _whisper_model is None:
+        with _whisper_model_lock:
+            if _whisper_model is None:
+                # CTranslate2 falls back to the closest supported compute type (int8 on CPU).
+                _whisper_model = WhisperModel(WHISPER_MODEL, device=WHISPER_DEVICE, compute_type=WHISPER_COMPUTE_TYPE)
+    return _whisper_model
+
+
+def preload_whisper_model():
     try:
-        for idx, (st, en) in enumerate(segments):
-            out_seg = work_tmp / f"seg_{idx:03d}.mp4"
-            cmd = [
-                "ffmpeg",
-                "-y",
-                "-ss",
-                f"{st:.3f}",
-                "-to",
-                f"{en:.3f}",
-                "-i",
-                input_path.as_posix(),
-                "-map",
-                "0:v:0",
-                "-map",
-                "0:a?",
-                "-c:v",
-                "libx264",
-                "-preset",
-                "veryfast",
-                "-crf",
-                "23",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "128k",
-                "-movflags",
-                "+faststart",
-                out_seg.as_posix(),
-            ]
-            run_cmd(cmd, trace_id=trace_id, stage="segment_extract", video_id=video_id)
-            log_media_streams(out_seg, trace_id=trace_id, stage="segment_extract", event="segment_streams", video_id=video_id)
-            segment_files.append(out_seg)
+        get_whisper_model()
+    except Exception as error:
+        # get_whisper_model() tries again on the first transcription.
+        log_error("startup", "whisper", "whisper_preload_failed", error, model=WHISPER_MODEL)
 
-        if not segment_files:
-            shutil.copy2(input_path, output_path)
-            return
 
-        concat_list = work_tmp / "concat.txt"
-        concat_list.write_text("\n".join([f"file '{p.as_posix()}'" for p in segment_files]), encoding="utf-8")
+def faster_whisper_to_srt(input_path: Path, srt_output: Path, trace_id: str, language: str = "pt", video_id: Optional[str] = None):
+    started = time.perf_counter()
+    segments, info = get_whisper_model().transcribe(input_path.as_posix(), language=language.split("-")[0].lower(), vad_filter=True)
+    captions = [(seg.start, seg.end, seg.text.strip()) for seg in segments if seg.text.strip()]
+    if not captions:
+        raise RuntimeError("whisper_output_empty")
+    write_manual_srt(captions, srt_output)
+    log_event(
+        "info",
+        trace_id,
+        "whisper",
+        "faster_whisper_done",
+        video_id=video_id,
+        model=WHISPER_MODEL,
+        caption_count=len(captions),
+        audio_duration=round(info.duration, 3),
+        duration_ms=int((time.perf_counter() - started) * 1000),
+    )
 
-        cmd_reencode = [
-            "ffmpeg",
-            "-y",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            concat_list.as_posix(),
-            "-map",
-            "0:v:0",
-            "-map",
-            "0:a?",
-            "-c:v",
-            "libx264",
-            "-preset",
-            "veryfast",
-            "-crf",
-            "23",
-            "-c:a",
-            "aac",
-            "-b:a",
-            "128k",
-            "-movflags",
-            "+faststart",
-            output_path.as_posix(),
-        ]
-        run_cmd(cmd_reencode, trace_id=trace_id, stage="segment_concat_reencode", video_id=video_id)
-        log_media_streams(output_path, trace_id=trace_id, stage="segment_concat_reencode", event="concat_streams", video_id=video_id)
-    finally:
-        shutil.rmtree(work_tmp, ignore_errors=True)
+
+WHISPER_CACHE_DIR = WORK_DIR / "whisper_cache"
+WHISPER_CACHE_MAX_BYTES = int(os.getenv("WHISPER_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+
+def whisper_cache_path(input_path: Path, language: str) -> Path:
+    # Content id plus size, language and model: identical audio transcribed the same way maps to one file.
+    key = f"{short_hash(input_path)}|{input_path.stat().st_size}|{language}|{WHISPER_MODEL}"
+    return WHISPER_CACHE_DIR / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.srt"
+
+
+def prune_whisper_cache():
+    """Drop least recently used SRTs (by mtime; hits touch theirs) until the cache fits WHISPER_CACHE_MAX_BYTES."""
+    entries = []
+    for path in WHISPER_CACHE_DIR.glob("*.srt"):
+        # produce_job_output's in-progress temp files (".<key>.<id>.part.srt") belong to a running job.
+        if path.name.startswith(".") or path.stem.endswith(".part"):
+            continue
+        with contextlib.suppress(FileNotFoundError):
+            st = path.stat()
+            entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= WHISPER_CACHE_MAX_BYTES:
+            break
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
+        total -= size
 
 
 def whisper_transcribe_to_srt(input_path: Path, srt_output: Path, trace_id: str, language: str = "pt", video_id: Optional[str] = None):
+    cached = whisper_cache_path(input_path, language)
+    try:
+        shutil.copyfile(cached, srt_output)
+        os.utime(cached)
+        log_event("info", trace_id, "whisper", "srt_cache_hit", video_id=video_id, cache_path=cached.as_posix())
+        return
+    except FileNotFoundError:
+        pass
+
+    if WhisperModel is not None:
+        try:
+            faster_whisper_to_srt(input_path, srt_output, trace_id=trace_id, language=language, video_id=video_id)
+        except Exception as error:
+            log_error(trace_id, "whisper", "faster_whisper_failed_fallback", error, video_id=video_id)
+            whisper_cli_to_srt(input_path, srt_output, trace_id=trace_id, language=language, video_id=video_id)
+    else:
+        whisper_cli_to_srt(input_path, srt_output, trace_id=trace_id, language=language, video_id=video_id)
+
+    try:
+        WHISPER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        produce_job_output(cached, lambda tmp: shutil.copyfile(srt_output, tmp))
+        prune_whisper_cache()
+    except OSError as error:
+        log_error(trace_id, "whisper", "srt_cache_store_failed", error, video_id=video_id)
+
+
+def whisper_cli_to_srt(input_path: Path, srt_output: Path, trace_id: str, language: str = "pt", video_id: Optional[str] = None):
     temp_dir = WORK_DIR / f"whisper_{uuid.uuid4().hex[:8]}"
     temp_dir.mkdir(parents=True, exist_ok=True)
     try:
-        whisper_model = os.getenv("WHISPER_MODEL", "base")
+        whisper_model = WHISPER_MODEL
         whisper_language = "Portuguese" if language.lower().startswith("pt") else language
         preferred = os.getenv("WHISPER_BIN", "").strip()
         candidates: list[list[str]] = []
@@ -1103,30 +1998,36 @@ def whisper_transcribe_to_srt(input_path: Path, srt_output: Path, trace_id: str,
             raise RuntimeError("whisper_output_missing")
         shutil.move(generated.as_posix(), srt_output.as_posix())
     finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        discard_dir(temp_dir)
+
+
+FONT_NAME_MAP = {
+    "montserrat": "Montserrat",
+    "dm serif display": "DM Serif Display",
+    "dmserifdisplay": "DM Serif Display",
+    "poppins": "Poppins",
+    "bebas": "Bebas Neue",
+    "bebasneue": "Bebas Neue",
+    "arial": "Arial",
+    "system": "Arial",
+}
+_WS_RE = re.compile(r"\s+")
+_HEX_RE = re.compile(r"^#?([0-9a-fA-F]{6})$")
+_FONT_RE = re.compile(r"(?:fonte|font)\s*[=:]\s*([^;\n]+)", re.IGNORECASE)
+_COLOR_RE = re.compile(r"(?:cor|color)\s*[=:]\s*(#[0-9a-fA-F]{6})", re.IGNORECASE)
 
 
 def _normalize_font_name(raw: str) -> str:
     cleaned = (raw or "").strip()
     if not cleaned:
         return "Arial"
-    mapping = {
-        "montserrat": "Montserrat",
-        "dm serif display": "DM Serif Display",
-        "dmserifdisplay": "DM Serif Display",
-        "poppins": "Poppins",
-        "bebas": "Bebas Neue",
-        "bebasneue": "Bebas Neue",
-        "arial": "Arial",
-        "system": "Arial",
-    }
-    key = re.sub(r"\s+", " ", cleaned.lower())
-    return mapping.get(key, cleaned[:64])
+    key = _WS_RE.sub(" ", cleaned.lower())
+    return FONT_NAME_MAP.get(key, cleaned[:64])
 
 
 def _hex_to_ass_bgr(color_hex: str) -> str:
     raw = (color_hex or "").strip()
-    match = re.match(r"^#?([0-9a-fA-F]{6})$", raw)
+    match = _HEX_RE.match(raw)
     if not match:
         return "&H00FFFFFF"
     rgb = match.group(1)
@@ -1139,11 +2040,11 @@ def parse_subtitle_style(style_prompt: str) -> dict[str, str]:
     font_name = "Arial"
     color_hex = "#FFFFFF"
 
-    font_match = re.search(r"(?:fonte|font)\s*[=:]\s*([^;\n]+)", text, flags=re.IGNORECASE)
+    font_match = _FONT_RE.search(text)
     if font_match:
         font_name = _normalize_font_name(font_match.group(1))
 
-    color_match = re.search(r"(?:cor|color)\s*[=:]\s*(#[0-9a-fA-F]{6})", text, flags=re.IGNORECASE)
+    color_match = _COLOR_RE.search(text)
     if color_match:
         color_hex = color_match.group(1).upper()
 
@@ -1154,14 +2055,7 @@ def parse_subtitle_style(style_prompt: str) -> dict[str, str]:
     }
 
 
-def burn_subtitles(
-    input_path: Path,
-    subtitles_path: Path,
-    output_path: Path,
-    trace_id: str,
-    video_id: Optional[str] = None,
-    style_prompt: str = "",
-):
+def subtitles_filter(subtitles_path: Path, trace_id: str, video_id: Optional[str] = None, style_prompt: str = "") -> str:
     escaped_sub = subtitles_path.as_posix().replace("'", "\\\\'")
     style_cfg = parse_subtitle_style(style_prompt)
     style = (
@@ -1180,64 +2074,202 @@ def burn_subtitles(
         color_hex=style_cfg["color_hex"],
         ass_primary=style_cfg["ass_primary"],
     )
+    return f"subtitles='{escaped_sub}':force_style='{style}'"
+
+
+def deliver_filter(width: int = 1080, height: int = 1920) -> str:
+    return f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,format=yuv420p"
+
+
+@functools.lru_cache(maxsize=1)
+def cuda_pad_available() -> bool:
+    # pad_cuda only ships with recent ffmpeg builds.
+    try:
+        proc = subprocess.run(["ffmpeg", "-hide_banner", "-filters"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return " pad_cuda " in proc.stdout
+
+
+def deliver_filter_cuda(width: int = 1080, height: int = 1920) -> str:
+    """deliver_filter for CUDA frames: scale on the GPU and, when the build allows, pad there too."""
+    scale = f"scale_cuda={width}:{height}:force_original_aspect_ratio=decrease:format=yuv420p"
+    if cuda_pad_available():
+        return f"{scale},pad_cuda={width}:{height}:(ow-iw)/2:(oh-ih)/2:black"
+    return f"{scale},hwdownload,format=yuv420p,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black"
+
+
+def burn_subtitles(
+    input_path: Path,
+    subtitles_path: Path,
+    output_path: Path,
+    trace_id: str,
+    video_id: Optional[str] = None,
+    style_prompt: str = "",
+):
+    cmd = [
+        "ffmpeg",
+        "-y",
+        *filter_thread_args(),
+        "-i",
+        input_path.as_posix(),
+        "-vf",
+        subtitles_filter(subtitles_path, trace_id=trace_id, video_id=video_id, style_prompt=style_prompt),
+        *av_output_args(),
+        output_path.as_posix(),
+    ]
+    run_cmd(cmd, trace_id=trace_id, stage="burn_subtitles", video_id=video_id)
+    log_media_streams(output_path, trace_id=trace_id, stage="burn_subtitles", event="burn_output_streams", video_id=video_id)
+
+
+def is_h264_aac(payload: dict[str, Any]) -> bool:
+    """True when the probed media already is yuv420p H.264 with AAC (or no) audio."""
+    streams = payload.get("streams") or []
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        return False
+    if (video.get("codec_name"), video.get("pix_fmt")) != ("h264", "yuv420p"):
+        return False
+    return all(s.get("codec_name") == "aac" for s in streams if s.get("codec_type") == "audio")
+
+
+def is_delivery_ready(payload: dict[str, Any], width: int = 1080, height: int = 1920) -> bool:
+    """True when the probed media already is WxH yuv420p H.264 with AAC (or no) audio."""
+    if not is_h264_aac(payload):
+        return False
+    video = next(s for s in payload["streams"] if s.get("codec_type") == "video")
+    return (video.get("width"), video.get("height")) == (width, height)
+
+
+def deliver_social(input_path: Path, output_path: Path, trace_id: str, video_id: Optional[str] = None, width: int = 1080, height: int = 1920):
+    try:
+        payload = probe_media(input_path, trace_id=trace_id, stage="deliver_probe", video_id=video_id)
+    except ValueError:
+        payload = {}
+    if is_delivery_ready(payload, width, height):
+        cmd = ["ffmpeg", "-y", "-i", input_path.as_posix(), *AV_MAP_ARGS, "-c", "copy", *FASTSTART_ARGS, output_path.as_posix()]
+        log_event("info", trace_id, "deliver", "deliver_stream_copy", video_id=video_id, path=input_path.as_posix())
+        run_cmd(cmd, trace_id=trace_id, stage="deliver_copy", video_id=video_id)
+        log_media_streams(output_path, trace_id=trace_id, stage="deliver", event="deliver_output_streams", video_id=video_id)
+        return
+    if nvenc_available():
+        cmd = [
+            "ffmpeg",
+            "-y",
+            *filter_thread_args(),
+            *build_decode_args(),
+            "-i",
+            input_path.as_posix(),
+            "-vf",
+            deliver_filter_cuda(width, height),
+            *av_output_args(),
+            output_path.as_posix(),
+        ]
+        try:
+            run_cmd(cmd, trace_id=trace_id, stage="deliver_cuda", video_id=video_id)
+            log_media_streams(output_path, trace_id=trace_id, stage="deliver", event="deliver_output_streams", video_id=video_id)
+            return
+        except RuntimeError as cuda_error:
+            # Inputs NVDEC cannot decode arrive as CPU frames, which the CUDA filters reject.
+            log_error(trace_id, "deliver_cuda", "deliver_cuda_failed_fallback", cuda_error, video_id=video_id)
     cmd = [
         "ffmpeg",
         "-y",
+        *filter_thread_args(),
         "-i",
         input_path.as_posix(),
         "-vf",
-        f"subtitles='{escaped_sub}':force_style='{style}'",
-        "-map",
-        "0:v:0",
-        "-map",
-        "0:a?",
-        "-c:v",
-        "libx264",
-        "-preset",
-        "veryfast",
-        "-crf",
-        "23",
-        "-c:a",
-        "aac",
-        "-b:a",
-        "128k",
-        "-movflags",
-        "+faststart",
+        deliver_filter(width, height),
+        *av_output_args(),
         output_path.as_posix(),
     ]
-    run_cmd(cmd, trace_id=trace_id, stage="burn_subtitles", video_id=video_id)
-    log_media_streams(output_path, trace_id=trace_id, stage="burn_subtitles", event="burn_output_streams", video_id=video_id)
+    run_cmd(cmd, trace_id=trace_id, stage="deliver", video_id=video_id)
+    log_media_streams(output_path, trace_id=trace_id, stage="deliver", event="deliver_output_streams", video_id=video_id)
 
 
-def deliver_social(input_path: Path, output_path: Path, trace_id: str, video_id: Optional[str] = None, width: int = 1080, height: int = 1920):
-    vf = f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black,format=yuv420p"
+def burn_and_deliver(
+    input_path: Path,
+    subtitles_path: Path,
+    output_path: Path,
+    trace_id: str,
+    video_id: Optional[str] = None,
+    style_prompt: str = "",
+    width: int = 1080,
+    height: int = 1920,
+):
+    """burn_subtitles followed by deliver_social, as one filtergraph and a single encode."""
+    vf = f"{subtitles_filter(subtitles_path, trace_id=trace_id, video_id=video_id, style_prompt=style_prompt)},{deliver_filter(width, height)}"
     cmd = [
         "ffmpeg",
         "-y",
+        *filter_thread_args(),
         "-i",
         input_path.as_posix(),
         "-vf",
         vf,
-        "-map",
-        "0:v:0",
-        "-map",
-        "0:a?",
-        "-c:v",
-        "libx264",
-        "-preset",
-        "veryfast",
-        "-crf",
-        "23",
-        "-c:a",
-        "aac",
-        "-b:a",
-        "128k",
-        "-movflags",
-        "+faststart",
+        *av_output_args(),
         output_path.as_posix(),
     ]
-    run_cmd(cmd, trace_id=trace_id, stage="deliver", video_id=video_id)
-    log_media_streams(output_path, trace_id=trace_id, stage="deliver", event="deliver_output_streams", video_id=video_id)
+    run_cmd(cmd, trace_id=trace_id, stage="burn_deliver", video_id=video_id)
+    log_media_streams(output_path, trace_id=trace_id, stage="burn_deliver", event="deliver_output_streams", video_id=video_id)
+
+
+PROGRESS_MIN_STEP = 0.25
+
+
+def progress_reporter(video_id: str, start: float, min_step: float = PROGRESS_MIN_STEP) -> Callable[..., None]:
+    """PROCESSING progress callback that only writes once progress has moved min_step past the last write."""
+    last = start
+
+    def report(progress: float, **fields: Any):
+        nonlocal last
+        if progress - last < min_step:
+            return
+        last = progress
+        upsert_video_status(video_id, "PROCESSING", progress, **fields)
+
+    return report
+
+
+VIDEO_STATUS_UPDATE_SQL = """
+    update videos
+    set status = ?,
+        progress = ?,
+        error_code = ?,
+        error_message = ?,
+        completed_at = case when ? = 1 then ? else completed_at end,
+        output_path = coalesce(?, output_path),
+        subtitles_path = coalesce(?, subtitles_path),
+        pipeline_timings_json = coalesce(?, pipeline_timings_json),
+        updated_at = ?
+    where id = ?
+"""
+PROGRESS_FLUSH_INTERVAL_SEC = max(0.02, int(os.getenv("VIDEO_PROGRESS_FLUSH_MS", "200")) / 1000)
+# Intermediate PROCESSING updates are parked here and written by one flusher thread, one transaction
+# per tick. Any other status (COMPLETE, FAILED, ...) takes the lock, drops the parked update and writes
+# synchronously, so a late flush can never overwrite a terminal state.
+_pending_progress: dict[str, tuple] = {}
+_progress_lock = threading.Lock()
+
+
+def flush_video_progress():
+    with _progress_lock:
+        if not _pending_progress:
+            return
+        stmts = [(VIDEO_STATUS_UPDATE_SQL, params) for params in _pending_progress.values()]
+        _pending_progress.clear()
+        with contextlib.suppress(sqlite3.Error):
+            db.execute_many_tx(stmts)
+
+
+def _progress_flusher():
+    while True:
+        time.sleep(PROGRESS_FLUSH_INTERVAL_SEC)
+        flush_video_progress()
+
+
+threading.Thread(target=_progress_flusher, name="progress-flusher", daemon=True).start()
+atexit.register(flush_video_progress)
 
 
 def upsert_video_status(
@@ -1252,34 +2284,29 @@ def upsert_video_status(
     pipeline_timings: Optional[dict[str, int]] = None,
 ):
     now = now_iso()
-    db.execute(
-        """
-        update videos
-        set status = ?,
-            progress = ?,
-            error_code = ?,
-            error_message = ?,
-            completed_at = case when ? = 1 then ? else completed_at end,
-            output_path = coalesce(?, output_path),
-            subtitles_path = coalesce(?, subtitles_path),
-            pipeline_timings_json = coalesce(?, pipeline_timings_json),
-            updated_at = ?
-        where id = ?
-        """,
-        (
-            status,
-            float(progress),
-            error_code,
-            error_message,
-            1 if completed else 0,
-            now,
-            output_path.as_posix() if output_path else None,
-            subtitles_path.as_posix() if subtitles_path else None,
-            json.dumps(pipeline_timings or {}) if pipeline_timings is not None else None,
-            now,
-            video_id,
-        ),
+    params = (
+        status,
+        float(progress),
+        error_code,
+        error_message,
+        1 if completed else 0,
+        now,
+        output_path.as_posix() if output_path else None,
+        subtitles_path.as_posix() if subtitles_path else None,
+        json_dumps(pipeline_timings or {}) if pipeline_timings is not None else None,
+        now,
+        video_id,
     )
+    coalesce = status == "PROCESSING" and not completed and error_code is None
+    with _progress_lock:
+        pending = _pending_progress.pop(video_id, None)
+        if pending is not None:
+            # Keep paths/timings from the parked update that this one does not override.
+            params = params[:6] + tuple(new if new is not None else old for new, old in zip(params[6:9], pending[6:9])) + params[9:]
+        if coalesce:
+            _pending_progress[video_id] = params
+            return
+        db.execute(VIDEO_STATUS_UPDATE_SQL, params)
 
 
 def create_video_record(
@@ -1292,16 +2319,18 @@ def create_video_record(
     source_video_id: Optional[str] = None,
     base_video_id: Optional[str] = None,
     manual_edited: bool = False,
-):
+) -> sqlite3.Row:
+    """Insert a QUEUED video and return the stored row, so callers need no follow-up SELECT."""
     video_id = str(uuid.uuid4())
     now = now_iso()
-    db.execute(
+    return db.execute_returning(
         """
         insert into videos (
           id,status,created_at,completed_at,progress,error_code,error_message,
           source_video_id,caption_template_id,input_path,output_path,subtitles_path,
           mode,style_prompt,language,manual_edited,base_video_id,updated_at
         ) values (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+        returning *
         """,
         (
             video_id,
@@ -1324,7 +2353,22 @@ def create_video_record(
             now,
         ),
     )
-    return video_id
+
+
+def start_video_processing(video_id: str, progress: float):
+    """Mark the video PROCESSING and return its row in one statement; 404 like get_video_row if missing."""
+    row = db.execute_returning(
+        """
+        update videos
+        set status = 'PROCESSING', progress = ?, error_code = null, error_message = null, updated_at = ?
+        where id = ?
+        returning *
+        """,
+        (float(progress), now_iso(), video_id),
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Video nao encontrado.")
+    return row
 
 
 def get_video_row(video_id: str):
@@ -1334,19 +2378,25 @@ def get_video_row(video_id: str):
     return row
 
 
+async def aget_video_row(video_id: str):
+    row = await db.afetchone("select * from videos where id = ?", (video_id,))
+    if not row:
+        raise HTTPException(status_code=404, detail="Video nao encontrado.")
+    return row
+
+
 def process_video_pipeline(video_id: str, trace_id: str, include_subtitles: bool = True, max_duration_seconds: Optional[float] = None):
     started = time.time()
     timings: dict[str, int] = {}
-    row = get_video_row(video_id)
+    row = start_video_processing(video_id, 0.1)
+    report_progress = progress_reporter(video_id, 0.1)
     input_path = Path(row["input_path"])
     mode = row["mode"] or "cut_captions"
     language = row["language"] or "pt-BR"
     style_prompt = row["style_prompt"] or ""
 
-    upsert_video_status(video_id, "PROCESSING", 0.1)
     auto_out = OUTPUT_DIR / f"auto_{video_id}.mp4"
     subtitles_out = OUTPUT_DIR / f"subs_{video_id}.srt"
-    captioned_out = OUTPUT_DIR / f"captioned_{video_id}.mp4"
     final_out = OUTPUT_DIR / f"final_{video_id}.mp4"
 
     try:
@@ -1364,9 +2414,8 @@ def process_video_pipeline(video_id: str, trace_id: str, include_subtitles: bool
             min_segment_duration=0.18,
         )
         timings["autoCutMs"] = int((time.time() - t0) * 1000)
-        upsert_video_status(video_id, "PROCESSING", 0.45)
+        report_progress(0.45)
 
-        render_input = auto_out
         subtitles_status = "disabled"
 
         if include_subtitles and mode in ["cut_captions", "captions"]:
@@ -1374,28 +2423,29 @@ def process_video_pipeline(video_id: str, trace_id: str, include_subtitles: bool
             try:
                 whisper_transcribe_to_srt(auto_out, subtitles_out, trace_id=trace_id, language=language, video_id=video_id)
                 timings["subtitleGenerateMs"] = int((time.time() - t1) * 1000)
+                report_progress(0.8, subtitles_path=subtitles_out)
 
+                # Burn and deliver share one encode; the final output already carries the captions.
                 t2 = time.time()
-                burn_subtitles(
+                burn_and_deliver(
                     auto_out,
                     subtitles_out,
-                    captioned_out,
+                    final_out,
                     trace_id=trace_id,
                     video_id=video_id,
                     style_prompt=style_prompt,
                 )
                 timings["subtitleBurnMs"] = int((time.time() - t2) * 1000)
-                render_input = captioned_out
                 subtitles_status = "applied"
             except Exception as sub_error:
                 subtitles_status = "failed"
                 log_error(trace_id, "subtitles", "subtitles_failed_fallback", sub_error, video_id=video_id)
 
-        upsert_video_status(video_id, "PROCESSING", 0.8, subtitles_path=subtitles_out if subtitles_out.exists() else None)
-
-        t3 = time.time()
-        deliver_social(render_input, final_out, trace_id=trace_id, video_id=video_id)
-        timings["deliverMs"] = int((time.time() - t3) * 1000)
+        if subtitles_status != "applied":
+            report_progress(0.8, subtitles_path=subtitles_out if subtitles_out.exists() else None)
+            t3 = time.time()
+            deliver_social(auto_out, final_out, trace_id=trace_id, video_id=video_id)
+            timings["deliverMs"] = int((time.time() - t3) * 1000)
 
         total_ms = int((time.time() - started) * 1000)
         timings["totalMs"] = total_ms
@@ -1427,12 +2477,11 @@ def process_video_pipeline(video_id: str, trace_id: str, include_subtitles: bool
 def process_manual_source_pipeline(video_id: str, trace_id: str):
     started = time.time()
     timings: dict[str, int] = {}
-    row = get_video_row(video_id)
+    row = start_video_processing(video_id, 0.2)
     input_path = Path(row["input_path"])
     final_out = OUTPUT_DIR / f"final_{video_id}.mp4"
 
     try:
-        upsert_video_status(video_id, "PROCESSING", 0.2)
         t0 = time.time()
         deliver_social(input_path, final_out, trace_id=trace_id, video_id=video_id)
         timings["manualPrepareDeliverMs"] = int((time.time() - t0) * 1000)
@@ -1528,6 +2577,33 @@ def resolve_existing_path(raw: str) -> Path:
     raise HTTPException(status_code=400, detail=f"Arquivo nao encontrado: {raw}")
 
 
+def job_output_name(prefix: str, suffix: str, payload: BaseModel, inputs: list[Path]) -> str:
+    """Deterministic output name for a job: same payload and unchanged inputs give the same artifact."""
+    h = hashlib.sha256(json_dumps_bytes(payload.model_dump(exclude={"output_name"})))
+    for path in inputs:
+        st = path.stat()
+        h.update(f"|{path.as_posix()}|{st.st_mtime_ns}|{st.st_size}".encode("utf-8"))
+    return f"{prefix}_{h.hexdigest()[:16]}{suffix}"
+
+
+def produce_job_output(out: Path, build: Callable[[Path], None], reuse: bool = True) -> dict[str, Any]:
+    """Skip the work when out already exists; otherwise build into a temp name and rename into place,
+    so a crashed run never leaves a partial file that a retry would mistake for a finished one.
+
+    Only content-keyed names (job_output_name, the whisper cache) may be reused; a caller-chosen
+    output_name says nothing about what produced the file, so pass reuse=False to always rebuild it."""
+    if reuse and out.exists() and out.stat().st_size > 0:
+        return {"output_path": out.as_posix(), "cached": True}
+    tmp = out.with_name(f".{out.stem}.{uuid.uuid4().hex[:8]}.part{out.suffix}")
+    try:
+        build(tmp)
+        os.replace(tmp, out)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            tmp.unlink()
+    return {"output_path": out.as_posix()}
+
+
 def normalize_segments(
     segments: list[dict[str, Any]],
     default_start: float,
@@ -1571,97 +2647,136 @@ def normalize_segments(
     return merged
 
 
+SEGMENT_BATCH_MAX_GAP_SEC = float(os.getenv("VIDEO_SEGMENT_BATCH_MAX_GAP_SEC", "10"))
+
+
+def batch_segments(indexed: list[tuple[int, float, float]], batch_size: int, max_gap: float) -> list[list[tuple[int, float, float]]]:
+    """Split ordered cuts into batches of at most batch_size, starting a new batch at any gap over max_gap.
+
+    A batch is decoded from its first cut to its last, gaps included, so a wide gap is cheaper as a fresh seek."""
+    batches: list[list[tuple[int, float, float]]] = []
+    for item in indexed:
+        if batches and len(batches[-1]) < batch_size and item[1] - batches[-1][-1][2] <= max_gap:
+            batches[-1].append(item)
+        else:
+            batches.append([item])
+    return batches
+
+
 def concat_from_segments(source_path: Path, segments: list[tuple[float, float]], output_path: Path, trace_id: str, video_id: str):
     work_tmp = WORK_DIR / f"manual_segments_{uuid.uuid4().hex[:10]}"
     work_tmp.mkdir(parents=True, exist_ok=True)
     segment_files: list[Path] = []
-    try:
-        for idx, (st, en) in enumerate(segments):
+
+    def extract_batch(batch: list[tuple[int, float, float]]) -> list[Path]:
+        # One ffmpeg per batch: seek to the first cut, decode once, and write every cut in the batch
+        # as its own output so codec setup is paid once per worker rather than once per segment.
+        batch_start = batch[0][1]
+        cmd = [
+            "ffmpeg",
+            "-y",
+            *filter_thread_args(SEGMENT_THREADS),
+            "-ss",
+            f"{batch_start:.3f}",
+            *build_decode_args(),
+            "-i",
+            source_path.as_posix(),
+        ]
+        outs: list[Path] = []
+        for idx, st, en in batch:
             out_seg = work_tmp / f"seg_{idx:03d}.mp4"
-            cmd = [
-                "ffmpeg",
-                "-y",
+            cmd += [
                 "-ss",
-                f"{st:.3f}",
+                f"{st - batch_start:.3f}",
                 "-to",
-                f"{en:.3f}",
-                "-i",
-                source_path.as_posix(),
-                "-map",
-                "0:v:0",
-                "-map",
-                "0:a?",
-                "-c:v",
-                "libx264",
-                "-preset",
-                "veryfast",
-                "-crf",
-                "23",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "128k",
-                "-movflags",
-                "+faststart",
+                f"{en - batch_start:.3f}",
+                *av_output_args(SEGMENT_THREADS),
                 out_seg.as_posix(),
             ]
-            run_cmd(cmd, trace_id=trace_id, stage="manual_segment_extract", video_id=video_id)
+            outs.append(out_seg)
+        run_cmd(cmd, trace_id=trace_id, stage="manual_segment_extract", video_id=video_id)
+        for out_seg in outs:
             log_media_streams(out_seg, trace_id=trace_id, stage="manual_segment_extract", event="manual_segment_streams", video_id=video_id)
-            segment_files.append(out_seg)
+        return outs
+
+    try:
+        # Batches are contiguous runs of segments handled in parallel; results are joined in order so concat.txt stays sorted.
+        indexed = [(idx, st, en) for idx, (st, en) in enumerate(segments)]
+        batch_count = max(1, min(SEGMENT_WORKERS, len(indexed)))
+        batch_size = -(-len(indexed) // batch_count) if indexed else 1
+        batches = batch_segments(indexed, batch_size, SEGMENT_BATCH_MAX_GAP_SEC)
+        futures = [segment_executor.submit(extract_batch, batch) for batch in batches]
+        try:
+            segment_files = [path for fut in futures for path in fut.result()]
+        except BaseException:
+            for fut in futures:
+                fut.cancel()
+            wait(futures)
+            raise
 
         if not segment_files:
-            shutil.copy2(source_path, output_path)
+            shutil.copyfile(source_path, output_path)
             return
 
         concat_list = work_tmp / "concat.txt"
         concat_list.write_text("\n".join([f"file '{p.as_posix()}'" for p in segment_files]), encoding="utf-8")
+        # Every segment came out of the same encoder settings, so the demuxer can join them without re-encoding.
+        cmd_copy = [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            concat_list.as_posix(),
+            *AV_MAP_ARGS,
+            "-c",
+            "copy",
+            *FASTSTART_ARGS,
+            output_path.as_posix(),
+        ]
+        try:
+            run_cmd(cmd_copy, trace_id=trace_id, stage="manual_segment_concat_copy", video_id=video_id)
+            log_media_streams(output_path, trace_id=trace_id, stage="manual_segment_concat_copy", event="manual_concat_streams", video_id=video_id)
+            return
+        except RuntimeError as copy_error:
+            log_error(trace_id, "manual_segment_concat_copy", "concat_copy_failed_fallback", copy_error, video_id=video_id)
+
         cmd_reencode = [
             "ffmpeg",
             "-y",
+            *filter_thread_args(),
             "-f",
             "concat",
             "-safe",
             "0",
+            *build_decode_args(),
             "-i",
             concat_list.as_posix(),
-            "-map",
-            "0:v:0",
-            "-map",
-            "0:a?",
-            "-c:v",
-            "libx264",
-            "-preset",
-            "veryfast",
-            "-crf",
-            "23",
-            "-c:a",
-            "aac",
-            "-b:a",
-            "128k",
-            "-movflags",
-            "+faststart",
+            *av_output_args(),
             output_path.as_posix(),
         ]
         run_cmd(cmd_reencode, trace_id=trace_id, stage="manual_segment_concat_reencode", video_id=video_id)
         log_media_streams(output_path, trace_id=trace_id, stage="manual_segment_concat_reencode", event="manual_concat_streams", video_id=video_id)
     finally:
-        shutil.rmtree(work_tmp, ignore_errors=True)
+        discard_dir(work_tmp)
 
 
 def _sec_to_srt(seconds: float) -> str:
-    seconds = max(0.0, seconds)
-    h = int(seconds // 3600)
-    m = int((seconds % 3600) // 60)
-    s = int(seconds % 60)
-    ms = int(round((seconds - int(seconds)) * 1000))
-    if ms >= 1000:
-        s += 1
-        ms -= 1000
+    # Round once to whole milliseconds so carries (59.9996s -> 00:01:00,000) fall out of divmod.
+    ms_total = int(round(max(0.0, seconds) * 1000))
+    h, rem = divmod(ms_total, 3_600_000)
+    m, rem = divmod(rem, 60_000)
+    s, ms = divmod(rem, 1000)
     return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
 
 
 def remap_manual_captions_from_source(manual_captions: list[dict[str, Any]], kept_segments: list[tuple[float, float]]) -> list[tuple[float, float, str]]:
+    """Map source-time captions onto the cut timeline; kept_segments must be sorted and non-overlapping."""
     mapped: list[tuple[float, float, str]] = []
+    seg_ends = [seg_en for _, seg_en in kept_segments]
+    offsets = list(itertools.accumulate((seg_en - seg_st for seg_st, seg_en in kept_segments), initial=0.0))
     for cap in manual_captions:
         text = str(cap.get("text", "")).strip()
         if not text:
@@ -1674,32 +2789,26 @@ def remap_manual_captions_from_source(manual_captions: list[dict[str, Any]], kep
         if src_end <= src_start:
             continue
 
-        acc = 0.0
-        for seg_st, seg_en in kept_segments:
-            seg_len = seg_en - seg_st
+        # Only segments ending after the caption starts can overlap it; walk forward until they start after it ends.
+        for idx in range(bisect.bisect_right(seg_ends, src_start), len(kept_segments)):
+            seg_st, seg_en = kept_segments[idx]
+            if seg_st >= src_end:
+                break
+            acc = offsets[idx]
             ov_st = max(src_start, seg_st)
             ov_en = min(src_end, seg_en)
-            if ov_en > ov_st:
-                out_st = acc + (ov_st - seg_st)
-                out_en = acc + (ov_en - seg_st)
-                if out_en - out_st >= 0.1:
-                    mapped.append((out_st, out_en, text))
-            acc += seg_len
+            out_st = acc + (ov_st - seg_st)
+            out_en = acc + (ov_en - seg_st)
+            if out_en - out_st >= 0.1:
+                mapped.append((out_st, out_en, text))
     return mapped
 
 
 def write_manual_srt(captions: list[tuple[float, float, str]], srt_path: Path):
-    lines: list[str] = []
-    for idx, (st, en, text) in enumerate(captions, start=1):
-        lines.extend(
-            [
-                str(idx),
-                f"{_sec_to_srt(st)} --> {_sec_to_srt(en)}",
-                text,
-                "",
-            ]
-        )
-    srt_path.write_text("\n".join(lines).strip() + "\n", encoding="utf-8")
+    body = "".join(
+        f"{idx}\n{_sec_to_srt(st)} --> {_sec_to_srt(en)}\n{text}\n\n" for idx, (st, en, text) in enumerate(captions, start=1)
+    )
+    srt_path.write_text(body.strip() + "\n", encoding="utf-8")
 
 
 def create_job(job_type: str, video_id: Optional[str] = None) -> str:
@@ -1715,7 +2824,7 @@ def create_job(job_type: str, video_id: Optional[str] = None) -> str:
 def update_job(job_id: str, status: str, result: Optional[dict[str, Any]] = None, error: Optional[str] = None):
     db.execute(
         "update jobs set status = ?, updated_at = ?, result_json = ?, error = ? where id = ?",
-        (status, now_iso(), json.dumps(result or {}), error, job_id),
+        (status, now_iso(), json_dumps(result or {}), error, job_id),
     )
 
 
@@ -1739,6 +2848,21 @@ def submit_async_job(job_id: str, trace_id: str, fn):
         active_futures[job_id] = fut
 
 
+def submit_pipeline(video_id: str, fn: Callable[[], None]):
+    """Queue a video pipeline on the bounded job executor; at most MAX_WORKERS pipelines and jobs run at once."""
+    fut = executor.submit(fn)
+    with active_lock:
+        active_futures[video_id] = fut
+
+    def forget(done: Any):
+        with active_lock:
+            if active_futures.get(video_id) is done:
+                active_futures.pop(video_id, None)
+
+    # Registered after the insert so a pipeline that finishes immediately is still removed.
+    fut.add_done_callback(forget)
+
+
 @app.middleware("http")
 async def trace_middleware(request: Request, call_next):
     trace_id = request_trace_id(request)
@@ -1766,7 +2890,9 @@ async def trace_middleware(request: Request, call_next):
 
 @app.get("/health")
 def health():
-    return {"ok": True, "app": APP_NAME, "db": DB_PATH.as_posix()}
+    with active_lock:
+        active = len(active_futures)
+    return {"ok": True, "app": APP_NAME, "db": DB_PATH.as_posix(), "active": active}
 
 
 @app.get("/v1/videos/captions/templates")
@@ -1796,133 +2922,139 @@ def list_templates():
     }
 
 
-@app.post("/v1/videos/edits")
-async def create_video_edit(
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+SAFE_NAME_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+SAFE_NAME_MAX_LEN = 120
+
+
+def safe_upload_name(name: Optional[str]) -> str:
+    # Keep the tail when truncating so the extension survives.
+    return SAFE_NAME_RE.sub("_", (name or "upload.mp4")[-SAFE_NAME_MAX_LEN:])
+
+
+def _copy_upload(src: Any, dest: Path) -> tuple[int, str]:
+    # Hash while copying so the file is not read back from disk just for short_hash.
+    src.seek(0)
+    h = content_hasher()
+    size = 0
+    with dest.open("wb") as out:
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            h.update(chunk)
+            out.write(chunk)
+            size += len(chunk)
+    return size, short_digest(h)
+
+
+async def spool_upload(upload: UploadFile, dest: Path) -> tuple[int, str]:
+    """Copy an upload to dest in fixed-size chunks on a worker thread; returns (bytes, short_hash)."""
+    return await run_in_threadpool(_copy_upload, upload.file, dest)
+
+
+async def _ingest_upload(
     request: Request,
-    background_tasks: BackgroundTasks,
-    video: UploadFile = File(...),
-    mode: str = Form("cut_captions"),
-    language: str = Form("pt-BR"),
-    style_prompt: str = Form(""),
-):
+    video: UploadFile,
+    *,
+    event: str,
+    mode: str,
+    language: str,
+    style_prompt: str,
+    caption_template_id: Optional[str],
+    pipeline_fn: Callable[..., None],
+    filename_prefix: str = "src",
+    **pipeline_kwargs: Any,
+) -> dict[str, Any]:
+    """Shared upload path: spool and hash the file, create the QUEUED row, queue the pipeline."""
     trace_id = request.state.trace_id
-    safe_name = re.sub(r"[^a-zA-Z0-9._-]+", "_", video.filename or "upload.mp4")
-    input_path = INPUT_DIR / f"src_{uuid.uuid4().hex[:10]}_{safe_name}"
-    payload = await video.read()
-    input_path.write_bytes(payload)
+    safe_name = safe_upload_name(video.filename)
+    input_path = INPUT_DIR / f"{filename_prefix}_{uuid.uuid4().hex[:10]}_{safe_name}"
+    size, file_hash = await spool_upload(video, input_path)
 
     log_event(
         "info",
         trace_id,
         "upload",
-        "video_received",
+        event,
         file_name=safe_name,
-        bytes=len(payload),
+        bytes=size,
         input_path=input_path.as_posix(),
-        file_hash=short_hash(input_path),
+        file_hash=file_hash,
         mode=mode,
         language=language,
     )
 
-    video_id = create_video_record(
+    row = await run_in_threadpool(
+        create_video_record,
         input_path=input_path,
         mode=mode,
         language=language,
         style_prompt=style_prompt,
-        caption_template_id="default-pt-br" if mode == "cut_captions" else None,
+        caption_template_id=caption_template_id,
     )
+    video_id = row["id"]
+    submit_pipeline(video_id, lambda: pipeline_fn(video_id, trace_id=trace_id, **pipeline_kwargs))
+    return video_row_to_item(row)
 
-    def run_pipeline():
-        process_video_pipeline(video_id, trace_id=trace_id, include_subtitles=mode == "cut_captions")
 
-    background_tasks.add_task(run_pipeline)
-    row = get_video_row(video_id)
-    return video_row_to_item(row)
+@app.post("/v1/videos/edits")
+async def create_video_edit(
+    request: Request,
+    video: UploadFile = File(...),
+    mode: str = Form("cut_captions"),
+    language: str = Form("pt-BR"),
+    style_prompt: str = Form(""),
+):
+    return await _ingest_upload(
+        request,
+        video,
+        event="video_received",
+        mode=mode,
+        language=language,
+        style_prompt=style_prompt,
+        caption_template_id="default-pt-br" if mode == "cut_captions" else None,
+        pipeline_fn=process_video_pipeline,
+        include_subtitles=mode == "cut_captions",
+    )
 
 
 @app.post("/v1/videos/captions")
 async def create_video_caption_compat(
     request: Request,
-    background_tasks: BackgroundTasks,
     video: UploadFile = File(...),
     language: str = Form("pt-BR"),
     instructions: str = Form(""),
     caption_template_id: Optional[str] = Form(None),
 ):
-    trace_id = request.state.trace_id
-    safe_name = re.sub(r"[^a-zA-Z0-9._-]+", "_", video.filename or "upload.mp4")
-    input_path = INPUT_DIR / f"src_{uuid.uuid4().hex[:10]}_{safe_name}"
-    payload = await video.read()
-    input_path.write_bytes(payload)
-
-    log_event(
-        "info",
-        trace_id,
-        "upload",
-        "video_received_legacy",
-        file_name=safe_name,
-        bytes=len(payload),
-        input_path=input_path.as_posix(),
-        file_hash=short_hash(input_path),
-        language=language,
-    )
-
-    video_id = create_video_record(
-        input_path=input_path,
+    return await _ingest_upload(
+        request,
+        video,
+        event="video_received_legacy",
         mode="cut_captions",
         language=language,
         style_prompt=instructions,
         caption_template_id=caption_template_id or "default-pt-br",
+        pipeline_fn=process_video_pipeline,
+        include_subtitles=True,
     )
 
-    def run_pipeline():
-        process_video_pipeline(video_id, trace_id=trace_id, include_subtitles=True)
-
-    background_tasks.add_task(run_pipeline)
-    row = get_video_row(video_id)
-    return video_row_to_item(row)
-
 
 @app.post("/v1/videos/manual-source")
 async def create_video_manual_source(
     request: Request,
-    background_tasks: BackgroundTasks,
     video: UploadFile = File(...),
     language: str = Form("pt-BR"),
 ):
-    trace_id = request.state.trace_id
-    safe_name = re.sub(r"[^a-zA-Z0-9._-]+", "_", video.filename or "upload.mp4")
-    input_path = INPUT_DIR / f"manual_src_{uuid.uuid4().hex[:10]}_{safe_name}"
-    payload = await video.read()
-    input_path.write_bytes(payload)
-
-    log_event(
-        "info",
-        trace_id,
-        "upload",
-        "manual_source_received",
-        file_name=safe_name,
-        bytes=len(payload),
-        input_path=input_path.as_posix(),
-        file_hash=short_hash(input_path),
-        language=language,
-    )
-
-    video_id = create_video_record(
-        input_path=input_path,
+    return await _ingest_upload(
+        request,
+        video,
+        event="manual_source_received",
         mode="manual_source",
         language=language,
         style_prompt="",
         caption_template_id=None,
+        pipeline_fn=process_manual_source_pipeline,
+        filename_prefix="manual_src",
     )
 
-    def run_pipeline():
-        process_manual_source_pipeline(video_id, trace_id=trace_id)
-
-    background_tasks.add_task(run_pipeline)
-    row = get_video_row(video_id)
-    return video_row_to_item(row)
-
 
 @app.get("/v1/videos/{video_id}")
 def get_video(video_id: str):
@@ -1936,9 +3068,22 @@ def get_video_content(video_id: str):
     if not output_path:
         raise HTTPException(status_code=404, detail="Conteudo ainda nao disponivel.")
     path = Path(output_path)
-    if not path.exists():
+    try:
+        stat_result = path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Arquivo final nao encontrado.")
-    return FileResponse(path.as_posix(), media_type="video/mp4", filename=path.name)
+    # Passing the stat avoids a second stat() in FileResponse; ETag/Last-Modified/ranges come from it.
+    return FileResponse(
+        path.as_posix(),
+        media_type="video/mp4",
+        filename=path.name,
+        stat_result=stat_result,
+        headers={"Cache-Control": "public, max-age=300"},
+    )
+
+
+EDITOR_SESSION_TTL = dt.timedelta(hours=8)
+EMPTY_ORDER_METADATA_JSON = json_dumps({"order_id": None})
 
 
 @app.post("/v1/videos/{video_id}/editor-session")
@@ -1953,14 +3098,16 @@ def create_editor_session(video_id: str, payload: EditorSessionInput, request: R
 
     session_id = str(uuid.uuid4())
     token = secrets.token_urlsafe(32)
-    created = now_iso()
-    expires = (dt.datetime.utcnow() + dt.timedelta(hours=8)).replace(microsecond=0).isoformat() + "Z"
-    db.execute(
-        "insert into editor_sessions (id,video_id,token,created_at,expires_at,last_used_at,metadata_json) values (?,?,?,?,?,?,?)",
-        (session_id, video_id, token, created, expires, None, json.dumps({"order_id": payload.order_id})),
-    )
-
-    db.execute("update videos set edit_session_id = ?, updated_at = ? where id = ?", (session_id, now_iso(), video_id))
+    now = now_dt_utc()
+    created = iso_from_dt(now)
+    expires = iso_from_dt(now + EDITOR_SESSION_TTL)
+    metadata_json = EMPTY_ORDER_METADATA_JSON if payload.order_id is None else json_dumps({"order_id": payload.order_id})
+    with db.transaction() as cur:
+        cur.execute(
+            "insert into editor_sessions (id,video_id,token,token_hash,created_at,expires_at,last_used_at,metadata_json) values (?,?,?,?,?,?,?,?)",
+            (session_id, video_id, "", editor_token_hash(token), created, expires, None, metadata_json),
+        )
+        cur.execute("update videos set edit_session_id = ?, updated_at = ? where id = ?", (session_id, created, video_id))
 
     editor_url = f"{PUBLIC_BASE_URL}/editor/index.html?videoId={video_id}&token={token}"
     log_event("info", trace_id, "manual", "editor_session_created", video_id=video_id, session_id=session_id)
@@ -1973,24 +3120,31 @@ def create_editor_session(video_id: str, payload: EditorSessionInput, request: R
 
 
 def validate_editor_token(video_id: str, token: str):
-    row = db.fetchone(
-        "select * from editor_sessions where video_id = ? and token = ? order by created_at desc limit 1",
-        (video_id, token),
+    # Only the token hash is stored; lookup and last_used_at touch happen in one indexed statement,
+    # and expired sessions are returned untouched.
+    now = now_iso()
+    row = db.execute_returning(
+        """
+        update editor_sessions
+        set last_used_at = case when expires_at < ? then last_used_at else ? end
+        where token_hash = ? and video_id = ?
+        returning *
+        """,
+        (now, now, editor_token_hash(token), video_id),
     )
     if not row:
         raise HTTPException(status_code=401, detail="invalid_editor_token")
-    if row["expires_at"] < now_iso():
+    if row["expires_at"] < now:
         raise HTTPException(status_code=401, detail="expired_editor_token")
-    db.execute("update editor_sessions set last_used_at = ? where id = ?", (now_iso(), row["id"]))
     return row
 
 
 @app.post("/v1/videos/{video_id}/manual-export")
-def manual_export(video_id: str, payload: ManualExportInput, request: Request, background_tasks: BackgroundTasks):
+async def manual_export(video_id: str, payload: ManualExportInput, request: Request):
     trace_id = request.state.trace_id
-    validate_editor_token(video_id, payload.token)
+    await run_in_threadpool(validate_editor_token, video_id, payload.token)
 
-    base_row = get_video_row(video_id)
+    base_row = await aget_video_row(video_id)
     if base_row["status"] != "COMPLETE":
         raise HTTPException(status_code=409, detail="base_video_not_complete")
 
@@ -1999,9 +3153,10 @@ def manual_export(video_id: str, payload: ManualExportInput, request: Request, b
         raise HTTPException(status_code=404, detail="base_video_output_missing")
 
     copied_input = INPUT_DIR / f"manual_src_{uuid.uuid4().hex[:10]}.mp4"
-    shutil.copy2(source_output, copied_input)
+    await run_in_threadpool(clone_file, source_output, copied_input)
 
-    manual_video_id = create_video_record(
+    manual_row = await run_in_threadpool(
+        create_video_record,
         input_path=copied_input,
         mode="manual",
         language=base_row["language"] or "pt-BR",
@@ -2010,10 +3165,11 @@ def manual_export(video_id: str, payload: ManualExportInput, request: Request, b
         base_video_id=video_id,
         manual_edited=True,
     )
+    manual_video_id = manual_row["id"]
 
     start_s = max(0.0, float(payload.start_seconds or 0.0))
     end_s = float(payload.end_seconds) if payload.end_seconds is not None else None
-    total_duration = ffprobe_duration(copied_input, trace_id=trace_id, video_id=manual_video_id)
+    total_duration = await affprobe_duration(copied_input, trace_id=trace_id, video_id=manual_video_id)
     normalized_segments = normalize_segments(payload.segments, start_s, end_s, total_duration)
     caption_mode = (payload.caption_mode or "auto").strip().lower()
     if caption_mode not in {"auto", "manual", "none"}:
@@ -2047,25 +3203,16 @@ def manual_export(video_id: str, payload: ManualExportInput, request: Request, b
             concat_from_segments(inp, normalized_segments, trimmed, trace_id=trace_id, video_id=manual_video_id)
             upsert_video_status(manual_video_id, "PROCESSING", 0.55)
 
-            render_input = trimmed
             subtitles_status = "disabled"
 
             if caption_mode != "none" and payload.include_subtitles:
                 try:
-                    burn_tmp = OUTPUT_DIR / f"manual_captioned_{manual_video_id}.mp4"
                     if caption_mode == "manual":
                         mapped_captions = remap_manual_captions_from_source(payload.manual_captions or [], normalized_segments)
                         if not mapped_captions:
                             raise RuntimeError("manual_captions_empty")
                         write_manual_srt(mapped_captions, manual_subs)
-                        burn_subtitles(
-                            trimmed,
-                            manual_subs,
-                            burn_tmp,
-                            trace_id=trace_id,
-                            video_id=manual_video_id,
-                            style_prompt=base_row["style_prompt"] or "",
-                        )
+                        subs_path = manual_subs
                     else:
                         whisper_transcribe_to_srt(
                             trimmed,
@@ -2074,15 +3221,15 @@ def manual_export(video_id: str, payload: ManualExportInput, request: Request, b
                             language=(payload.subtitles_language or base_row["language"] or "pt-BR"),
                             video_id=manual_video_id,
                         )
-                        burn_subtitles(
-                            trimmed,
-                            auto_subs,
-                            burn_tmp,
-                            trace_id=trace_id,
-                            video_id=manual_video_id,
-                            style_prompt=base_row["style_prompt"] or "",
-                        )
-                    render_input = burn_tmp
+                        subs_path = auto_subs
+                    burn_and_deliver(
+                        trimmed,
+                        subs_path,
+                        final,
+                        trace_id=trace_id,
+                        video_id=manual_video_id,
+                        style_prompt=base_row["style_prompt"] or "",
+                    )
                     subtitles_status = "applied"
                 except Exception as sub_error:
                     subtitles_status = "failed"
@@ -2095,7 +3242,8 @@ def manual_export(video_id: str, payload: ManualExportInput, request: Request, b
                         caption_mode=caption_mode,
                     )
 
-            deliver_social(render_input, final, trace_id=trace_id, video_id=manual_video_id)
+            if subtitles_status != "applied":
+                deliver_social(trimmed, final, trace_id=trace_id, video_id=manual_video_id)
             upsert_video_status(
                 manual_video_id,
                 "COMPLETE",
@@ -2133,9 +3281,9 @@ def manual_export(video_id: str, payload: ManualExportInput, request: Request, b
             )
             log_error(trace_id, "manual", "manual_export_failed", error, video_id=manual_video_id, base_video_id=video_id)
 
-    background_tasks.add_task(run_manual_pipeline)
+    submit_pipeline(manual_video_id, run_manual_pipeline)
     return {
-        "video": video_row_to_item(get_video_row(manual_video_id)),
+        "video": video_row_to_item(manual_row),
         "baseVideoId": video_id,
     }
 
@@ -2147,21 +3295,23 @@ def jobs_auto_edit(payload: JobAutoEditInput, request: Request):
 
     def run():
         inp = resolve_existing_path(payload.input_path)
-        out_name = payload.output_name or f"auto_{job_id}.mp4"
-        out = OUTPUT_DIR / out_name
-        auto_cut_video(
-            inp,
-            out,
-            trace_id=trace_id,
-            video_id=None,
-            max_duration_seconds=payload.max_duration_seconds,
-            silence_noise_db=payload.silence_noise_db,
-            silence_min_duration=payload.silence_min_duration,
-            padding_before=payload.padding_before,
-            padding_after=payload.padding_after,
-            min_segment_duration=payload.min_segment_duration,
+        out_name = payload.output_name or job_output_name("auto", ".mp4", payload, [inp])
+        return produce_job_output(
+            OUTPUT_DIR / out_name,
+            lambda out: auto_cut_video(
+                inp,
+                out,
+                trace_id=trace_id,
+                video_id=None,
+                max_duration_seconds=payload.max_duration_seconds,
+                silence_noise_db=payload.silence_noise_db,
+                silence_min_duration=payload.silence_min_duration,
+                padding_before=payload.padding_before,
+                padding_after=payload.padding_after,
+                min_segment_duration=payload.min_segment_duration,
+            ),
+            reuse=not payload.output_name,
         )
-        return {"output_path": out.as_posix()}
 
     submit_async_job(job_id, trace_id=trace_id, fn=run)
     return {"job_id": job_id}
@@ -2174,10 +3324,12 @@ def jobs_subtitles_generate(payload: JobSubtitleGenerateInput, request: Request)
 
     def run():
         inp = resolve_existing_path(payload.input_path)
-        out_name = payload.output_name or f"subs_{job_id}.srt"
-        out = OUTPUT_DIR / out_name
-        whisper_transcribe_to_srt(inp, out, trace_id=trace_id, language=payload.language, video_id=None)
-        return {"output_path": out.as_posix()}
+        out_name = payload.output_name or job_output_name("subs", ".srt", payload, [inp])
+        return produce_job_output(
+            OUTPUT_DIR / out_name,
+            lambda out: whisper_transcribe_to_srt(inp, out, trace_id=trace_id, language=payload.language, video_id=None),
+            reuse=not payload.output_name,
+        )
 
     submit_async_job(job_id, trace_id=trace_id, fn=run)
     return {"job_id": job_id}
@@ -2191,10 +3343,12 @@ def jobs_subtitles_burn(payload: JobSubtitleBurnInput, request: Request):
     def run():
         inp = resolve_existing_path(payload.input_path)
         subs = resolve_existing_path(payload.subtitles_path)
-        out_name = payload.output_name or f"captioned_{job_id}.mp4"
-        out = OUTPUT_DIR / out_name
-        burn_subtitles(inp, subs, out, trace_id=trace_id, video_id=None)
-        return {"output_path": out.as_posix()}
+        out_name = payload.output_name or job_output_name("captioned", ".mp4", payload, [inp, subs])
+        return produce_job_output(
+            OUTPUT_DIR / out_name,
+            lambda out: burn_subtitles(inp, subs, out, trace_id=trace_id, video_id=None),
+            reuse=not payload.output_name,
+        )
 
     submit_async_job(job_id, trace_id=trace_id, fn=run)
     return {"job_id": job_id}
@@ -2207,10 +3361,12 @@ def jobs_deliver(payload: JobDeliverInput, request: Request):
 
     def run():
         inp = resolve_existing_path(payload.input_path)
-        out_name = payload.output_name or f"final_{job_id}.mp4"
-        out = OUTPUT_DIR / out_name
-        deliver_social(inp, out, trace_id=trace_id, video_id=None, width=payload.width, height=payload.height)
-        return {"output_path": out.as_posix()}
+        out_name = payload.output_name or job_output_name("final", ".mp4", payload, [inp])
+        return produce_job_output(
+            OUTPUT_DIR / out_name,
+            lambda out: deliver_social(inp, out, trace_id=trace_id, video_id=None, width=payload.width, height=payload.height),
+            reuse=not payload.output_name,
+        )
 
     submit_async_job(job_id, trace_id=trace_id, fn=run)
     return {"job_id": job_id}
@@ -2248,6 +3404,36 @@ def build_client_incident_context(stage: str, event_name: str, meta: dict[str, A
     }
 
 
+# Mobile clients often fire the same error many times a session. Within the TTL a repeat only bumps the
+# in-memory window count; it is written to sqlite again when it would change the incident level or
+# once the entry expires.
+CLIENT_INCIDENT_DEDUPE_TTL_SEC = 60.0
+CLIENT_INCIDENT_DEDUPE_SIZE = 4096
+_client_incident_dedupe: OrderedDict[tuple, tuple[float, dict[str, Any]]] = OrderedDict()
+_client_incident_dedupe_lock = threading.Lock()
+
+
+def repeat_client_incident(key: tuple) -> Optional[dict[str, Any]]:
+    with _client_incident_dedupe_lock:
+        entry = _client_incident_dedupe.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        _client_incident_dedupe.move_to_end(key)
+        incident_meta = entry[1]
+    count = incident_manager.record_repeat(incident_meta["incident_fingerprint"])
+    if count is None:
+        return None
+    return {**incident_meta, "incident_count_15m": count, "incident_deduped": True}
+
+
+def remember_client_incident(key: tuple, incident_meta: dict[str, Any]):
+    with _client_incident_dedupe_lock:
+        _client_incident_dedupe[key] = (time.monotonic() + CLIENT_INCIDENT_DEDUPE_TTL_SEC, incident_meta)
+        _client_incident_dedupe.move_to_end(key)
+        while len(_client_incident_dedupe) > CLIENT_INCIDENT_DEDUPE_SIZE:
+            _client_incident_dedupe.popitem(last=False)
+
+
 @app.post("/v1/debug/client-events")
 def client_events(payload: ClientEventInput, request: Request):
     request_trace = request.state.trace_id
@@ -2273,18 +3459,23 @@ def client_events(payload: ClientEventInput, request: Request):
         error_type = clip_text(meta.get("error_type") or infer_error_type(error_message), 120)
         request_id = meta_lookup(meta, ["request_id", "requestId"])
         run_id = meta_lookup(meta, ["run_id", "runId", "job_id", "video_id"])
+        context = build_client_incident_context(stage, event_name, meta, request)
+        dedupe_key = (stage, event_name, error_type, error_message, error_stack, tuple(sorted((k, str(v)) for k, v in context.items())))
         with contextlib.suppress(Exception):
-            incident_meta = incident_manager.register(
-                error_type=error_type,
-                message=error_message,
-                stack=error_stack,
-                context=build_client_incident_context(stage, event_name, meta, request),
-                stage=f"client_{stage}",
-                event=event_name,
-                trace_id=trace_id,
-                request_id=request_id,
-                run_id=run_id,
-            )
+            incident_meta = repeat_client_incident(dedupe_key)
+            if incident_meta is None:
+                incident_meta = incident_manager.register(
+                    error_type=error_type,
+                    message=error_message,
+                    stack=error_stack,
+                    context=context,
+                    stage=f"client_{stage}",
+                    event=event_name,
+                    trace_id=trace_id,
+                    request_id=request_id,
+                    run_id=run_id,
+                )
+                remember_client_incident(dedupe_key, incident_meta)
 
     log_event(
         safe_level,
@@ -2299,28 +3490,78 @@ def client_events(payload: ClientEventInput, request: Request):
     return {"ok": True}
 
 
-@app.get("/internal/logs/tail")
+LOG_FILES_TTL_SEC = 2.0
+_log_files_cache: tuple[float, list[Path]] = (0.0, [])
+_log_files_lock = threading.Lock()
+
+
+def list_log_files() -> list[Path]:
+    """Daily log files, newest first; the directory listing is reused for LOG_FILES_TTL_SEC."""
+    global _log_files_cache
+    with _log_files_lock:
+        expires, files = _log_files_cache
+        if time.monotonic() < expires:
+            return files
+        files = sorted(LOGS_DIR.glob("video-editor-api-*.jsonl"), reverse=True)
+        _log_files_cache = (time.monotonic() + LOG_FILES_TTL_SEC, files)
+        return files
+
+
+def iter_lines_reversed(path: Path):
+    """Yield the non-empty lines of a file as bytes, last line first, walking a read-only mmap backwards."""
+    try:
+        f = path.open("rb")
+    except FileNotFoundError:
+        return
+    with f:
+        # Only the bytes present now are mapped; lines appended while iterating are left for the next call.
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            while end > 0:
+                start = mm.rfind(b"\n", 0, end) + 1
+                if start < end:
+                    yield mm[start:end]
+                end = start - 1
+
+
+def _log_needle(value: Optional[str]) -> Optional[bytes]:
+    # Only plain ASCII values are guaranteed to appear verbatim in the encoded JSON line.
+    if not value or not (value.isascii() and value.isprintable()) or '"' in value or "\\" in value:
+        return None
+    return value.encode("ascii")
+
+
+def require_internal_key(x_api_key: Optional[str] = Header(default=None)):
+    if not INTERNAL_API_KEY:
+        return
+    if not x_api_key or not hmac.compare_digest(x_api_key.encode("utf-8"), INTERNAL_API_KEY.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="unauthorized")
+
+
+@app.get("/internal/logs/tail", dependencies=[Depends(require_internal_key)])
 def logs_tail(
     request: Request,
     videoId: Optional[str] = Query(default=None),
     orderId: Optional[str] = Query(default=None),
     traceId: Optional[str] = Query(default=None),
     limit: int = Query(default=200, ge=1, le=1000),
-    x_api_key: Optional[str] = Header(default=None),
 ):
     trace_id = request.state.trace_id
-    if INTERNAL_API_KEY and x_api_key != INTERNAL_API_KEY:
-        raise HTTPException(status_code=401, detail="unauthorized")
 
-    files = sorted(LOGS_DIR.glob("video-editor-api-*.jsonl"), reverse=True)
+    log_writer.flush()
+    files = list_log_files()
+    needles = [n for n in (_log_needle(videoId), _log_needle(orderId), _log_needle(traceId)) if n]
     out: list[dict[str, Any]] = []
     for fp in files:
-        lines = fp.read_text(encoding="utf-8", errors="ignore").splitlines()
-        for raw in reversed(lines):
+        for raw in iter_lines_reversed(fp):
             if len(out) >= limit:
                 break
+            if not all(n in raw for n in needles):
+                continue
             with contextlib.suppress(Exception):
-                item = json.loads(raw)
+                item = json_loads(raw)
                 m = item.get("meta", {})
                 if videoId and str(m.get("video_id", "")) != str(videoId):
                     continue
@@ -2333,20 +3574,18 @@ def logs_tail(
             break
 
     log_event("info", trace_id, "logs", "tail_read", count=len(out), video_id=videoId, order_id=orderId, trace_id_filter=traceId, limit=limit)
-    return {"count": len(out), "items": out}
+    # Items are already plain decoded JSON; serialize them directly instead of through jsonable_encoder.
+    return Response(content=json_dumps_bytes({"count": len(out), "items": out}), media_type="application/json")
 
 
-@app.get("/internal/incidents/tail")
+@app.get("/internal/incidents/tail", dependencies=[Depends(require_internal_key)])
 def incidents_tail(
     request: Request,
     limit: int = Query(default=200, ge=1, le=1000),
     fingerprint: Optional[str] = Query(default=None),
     minLevel: int = Query(default=0, ge=0, le=3),
-    x_api_key: Optional[str] = Header(default=None),
 ):
     trace_id = request.state.trace_id
-    if INTERNAL_API_KEY and x_api_key != INTERNAL_API_KEY:
-        raise HTTPException(status_code=401, detail="unauthorized")
 
     items = incident_manager.tail(limit=limit, fingerprint=fingerprint, min_level=minLevel)
     log_event(
@@ -2367,5 +3606,28 @@ async def http_exc(_request: Request, exc: HTTPException):
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
 
-app.mount("/media/storage/output", StaticFiles(directory=OUTPUT_DIR.as_posix()), name="output-media")
-app.mount("/editor", StaticFiles(directory=EDITOR_DIR.as_posix(), html=True), name="editor-web")
+HASHED_ASSET_RE = re.compile(r"\.[0-9a-f]{8,}\.(?:js|css|mjs|woff2?|png|jpe?g|svg|webp)$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with Cache-Control and a cheap mtime/size ETag so repeat loads revalidate with a 304."""
+
+    def __init__(self, *args, max_age: int = 60, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={int(max_age)}"
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers["ETag"] = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+        if HASHED_ASSET_RE.search(os.fspath(full_path)):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["Cache-Control"] = self.cache_control
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+app.mount("/media/storage/output", CachedStaticFiles(directory=OUTPUT_DIR.as_posix()), name="output-media")
+app.mount("/editor", CachedStaticFiles(directory=EDITOR_DIR.as_posix(), html=True), name="editor-web")
@@ -1,6 +1,22 @@
+import tempfile
 import unittest
+from pathlib import Path
 
-from src.main import parse_silences
+from src.main import (
+    _sec_to_srt,
+    batch_segments,
+    clone_file,
+    is_h264_aac,
+    is_delivery_ready,
+    iter_lines_reversed,
+    json_dumps,
+    json_loads,
+    parse_ffmpeg_duration,
+    parse_silences,
+    produce_job_output,
+    remap_manual_captions_from_source,
+    trim_concat_filter,
+)
 
 
 class ParseSilencesTests(unittest.TestCase):
@@ -15,10 +31,137 @@ class ParseSilencesTests(unittest.TestCase):
         self.assertTrue(len(out) >= 2)
         self.assertAlmostEqual(out[0][0], 0.0, places=3)
 
+    def test_parse_silences_open_silence_runs_to_end(self):
+        stderr = """
+        [silencedetect @ x] silence_start: 1.0
+        [silencedetect @ x] silence_end: 2.0 | silence_duration: 1.0
+        [silencedetect @ x] silence_start: 8.0
+        """
+        out = parse_silences(stderr, total_duration=10.0, padding_before=0.0, padding_after=0.0, min_segment_duration=0.2)
+        self.assertEqual(out, [(0.0, 1.0), (2.0, 8.0)])
+
+    def test_parse_silences_accepts_raw_stderr_bytes(self):
+        stderr = b"[silencedetect @ x] silence_start: 1.0\n[silencedetect @ x] silence_end: 2.0 | silence_duration: 1.0\n"
+        out = parse_silences(stderr, total_duration=4.0, padding_before=0.0, padding_after=0.0, min_segment_duration=0.2)
+        self.assertEqual(out, [(0.0, 1.0), (2.0, 4.0)])
+
     def test_parse_silences_fallback_full_duration(self):
         out = parse_silences("", total_duration=10.0, padding_before=0.1, padding_after=0.1, min_segment_duration=0.2)
         self.assertEqual(out, [(0.0, 10.0)])
 
 
+class RemapCaptionsTests(unittest.TestCase):
+    def test_remap_shifts_captions_onto_cut_timeline(self):
+        segments = [(0.0, 2.0), (5.0, 8.0), (10.0, 12.0)]
+        captions = [
+            {"text": "a", "start_seconds": 1.0, "end_seconds": 6.0},
+            {"text": "b", "start_seconds": 2.5, "end_seconds": 4.5},
+            {"text": "c", "start_seconds": 11.0, "end_seconds": 11.5},
+        ]
+        out = remap_manual_captions_from_source(captions, segments)
+        self.assertEqual(out, [(1.0, 2.0, "a"), (2.0, 3.0, "a"), (6.0, 6.5, "c")])
+
+
+class JsonDumpsTests(unittest.TestCase):
+    def test_falls_back_for_values_orjson_rejects(self):
+        value = {"big": 123456789012345678901234567890, "surrogate": "\ud800", 1: "int key"}
+        encoded = json_dumps(value)
+        self.assertEqual(json_loads(encoded), {"big": 123456789012345678901234567890, "surrogate": "\ud800", "1": "int key"})
+        self.assertEqual(json_loads(json_dumps({"a": "é"})), {"a": "é"})
+
+
+class BatchSegmentsTests(unittest.TestCase):
+    def test_wide_gaps_start_a_new_batch(self):
+        cuts = [(0, 0.0, 5.0), (1, 6.0, 8.0), (2, 3600.0, 3605.0), (3, 3606.0, 3607.0)]
+        self.assertEqual(batch_segments(cuts, 4, 10.0), [cuts[:2], cuts[2:]])
+        self.assertEqual(batch_segments(cuts[:2], 1, 10.0), [cuts[:1], cuts[1:2]])
+        self.assertEqual(batch_segments([], 1, 10.0), [])
+
+
+class TrimConcatFilterTests(unittest.TestCase):
+    def test_trims_each_range_and_concats_with_source_timing(self):
+        graph = trim_concat_filter([(0.0, 1.0), (2.5, 3.0)], has_audio=True)
+        self.assertIn("[vs1]trim=start=2.500:end=3.000,setpts=PTS-STARTPTS[vt1]", graph)
+        self.assertIn("[as1]atrim=start=2.500:end=3.000,asetpts=PTS-STARTPTS[at1]", graph)
+        self.assertTrue(graph.endswith("[vt0][at0][vt1][at1]concat=n=2:v=1:a=1[v][a]"))
+        self.assertNotIn("FRAME_RATE", graph)
+        self.assertTrue(trim_concat_filter([(0.0, 1.0)], has_audio=False).endswith("[vt0]concat=n=1:v=1:a=0[v]"))
+
+
+class DeliveryReadyTests(unittest.TestCase):
+    def test_matching_h264_aac_is_ready(self):
+        payload = {
+            "streams": [
+                {"codec_type": "video", "codec_name": "h264", "width": 1080, "height": 1920, "pix_fmt": "yuv420p"},
+                {"codec_type": "audio", "codec_name": "aac"},
+            ]
+        }
+        self.assertTrue(is_delivery_ready(payload))
+        self.assertFalse(is_delivery_ready(payload, width=720, height=1280))
+
+    def test_other_pix_fmt_or_audio_codec_needs_encode(self):
+        video = {"codec_type": "video", "codec_name": "h264", "width": 1080, "height": 1920, "pix_fmt": "yuv444p"}
+        self.assertFalse(is_delivery_ready({"streams": [video]}))
+        video["pix_fmt"] = "yuv420p"
+        self.assertFalse(is_delivery_ready({"streams": [video, {"codec_type": "audio", "codec_name": "opus"}]}))
+        self.assertFalse(is_delivery_ready({}))
+
+    def test_h264_aac_check_ignores_dimensions(self):
+        video = {"codec_type": "video", "codec_name": "h264", "width": 320, "height": 240, "pix_fmt": "yuv420p"}
+        self.assertTrue(is_h264_aac({"streams": [video, {"codec_type": "audio", "codec_name": "aac"}]}))
+        self.assertFalse(is_h264_aac({"streams": [dict(video, codec_name="hevc")]}))
+        self.assertFalse(is_h264_aac({}))
+
+
+class SecToSrtTests(unittest.TestCase):
+    def test_formats_and_carries_rounded_milliseconds(self):
+        self.assertEqual(_sec_to_srt(0.0), "00:00:00,000")
+        self.assertEqual(_sec_to_srt(3661.25), "01:01:01,250")
+        self.assertEqual(_sec_to_srt(59.9996), "00:01:00,000")
+        self.assertEqual(_sec_to_srt(-1.0), "00:00:00,000")
+
+
+class ParseFfmpegDurationTests(unittest.TestCase):
+    def test_reads_header_duration(self):
+        self.assertAlmostEqual(parse_ffmpeg_duration(b"  Duration: 01:02:03.45, start: 0.000000, bitrate: 512 kb/s\n"), 3723.45)
+        self.assertIsNone(parse_ffmpeg_duration(b"  Duration: N/A, bitrate: N/A\n"))
+
+
+class IterLinesReversedTests(unittest.TestCase):
+    def test_yields_lines_last_first(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "log.jsonl"
+            path.write_bytes(b"first\n\nsecond line\nthird\n")
+            self.assertEqual(list(iter_lines_reversed(path)), [b"third", b"second line", b"first"])
+            path.write_bytes(b"\nonly")
+            self.assertEqual(list(iter_lines_reversed(path)), [b"only"])
+            path.write_bytes(b"")
+            self.assertEqual(list(iter_lines_reversed(path)), [])
+
+
+class CloneFileTests(unittest.TestCase):
+    def test_recloning_onto_a_hardlink_keeps_the_source(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / "in.mp4"
+            dst = Path(tmp) / "out.mp4"
+            src.write_bytes(b"x" * 1000)
+            clone_file(src, dst)
+            clone_file(src, dst)
+            self.assertEqual(src.read_bytes(), b"x" * 1000)
+            self.assertEqual(dst.read_bytes(), b"x" * 1000)
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), ["in.mp4", "out.mp4"])
+
+
+class ProduceJobOutputTests(unittest.TestCase):
+    def test_reuses_existing_output_only_when_allowed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "final.mp4"
+            self.assertEqual(produce_job_output(out, lambda p: p.write_bytes(b"first")), {"output_path": out.as_posix()})
+            self.assertTrue(produce_job_output(out, lambda p: p.write_bytes(b"second"))["cached"])
+            self.assertEqual(out.read_bytes(), b"first")
+            self.assertNotIn("cached", produce_job_output(out, lambda p: p.write_bytes(b"third"), reuse=False))
+            self.assertEqual(out.read_bytes(), b"third")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,7 @@
 import datetime as dt
+import hashlib
 import json
+import sqlite3
 import tempfile
 import unittest
 from pathlib import Path
@@ -24,7 +26,13 @@ class IncidentLoggingTests(unittest.TestCase):
         self.base = Path(self.tmp.name)
         self.db = main.Db(self.base / "state.db")
         self.clock = FixedClock(dt.datetime(2026, 2, 22, 12, 0, 0))
-        self.manager = main.IncidentManager(
+        self.manager = self._make_manager()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _make_manager(self, **kwargs) -> main.IncidentManager:
+        return main.IncidentManager(
             self.db,
             self.base / "logs" / "incidents",
             window_minutes=15,
@@ -33,11 +41,9 @@ class IncidentLoggingTests(unittest.TestCase):
             level_l2=5,
             level_l3=8,
             now_provider=self.clock.now,
+            **kwargs,
         )
 
-    def tearDown(self):
-        self.tmp.cleanup()
-
     def register_once(self, *, message: str = "PHPhotosErrorDomain error 3164", stack: str = "Traceback: launchImageLibraryAsync"):
         result = self.manager.register(
             error_type="PHPhotosErrorDomain",
@@ -73,6 +79,43 @@ class IncidentLoggingTests(unittest.TestCase):
         self.assertEqual(after_window["incident_count_15m"], 1)
         self.assertEqual(after_window["incident_level"], 0)
 
+    def test_window_count_survives_restart(self):
+        self.register_once()
+        self.register_once()
+        self.manager = self._make_manager()
+        third = self.register_once()
+        self.assertEqual(third["incident_count_15m"], 3)
+        self.assertEqual(third["incident_level"], 1)
+
+    def test_record_repeat_counts_in_memory_until_level_changes(self):
+        fingerprint = self.register_once()["incident_fingerprint"]
+        self.assertIsNone(self.manager.record_repeat("unknown"))
+        self.assertEqual(self.manager.record_repeat(fingerprint), 2)
+        # The third occurrence would reach L1, so it must be registered for real.
+        self.assertIsNone(self.manager.record_repeat(fingerprint))
+        third = self.register_once()
+        self.assertEqual(third["incident_count_15m"], 3)
+        self.assertEqual(third["incident_level"], 1)
+
+    def test_fingerprint_uses_canonical_json_of_primary_context(self):
+        context = {"stage": "picker", "code": 1, "nested": {"b": 1, "a": 2}, "reason": "a;b=c"}
+        primary = {"stage": "picker", "code": 1, "reason": "a;b=c"}
+        raw = f"T|msg|stack|{json.dumps(primary, sort_keys=True, ensure_ascii=True)}"
+        self.assertEqual(self.manager.fingerprint("T", "msg", "stack", context), hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24])
+        self.assertNotEqual(
+            self.manager.fingerprint("T", "msg", "stack", {"code": 1}),
+            self.manager.fingerprint("T", "msg", "stack", {"code": "1"}),
+        )
+
+    def test_expired_fingerprints_are_dropped_from_memory(self):
+        first = self.register_once(message="one-off error")["incident_fingerprint"]
+        second = self.register_once(message="another one-off")["incident_fingerprint"]
+        self.clock.advance(minutes=16)
+        self.assertIsNone(self.manager.record_repeat(second))
+        self.register_once()
+        self.assertNotIn(first, self.manager._windows)
+        self.assertNotIn(second, self.manager._windows)
+
     def test_level_transitions_l0_l1_l2_l3(self):
         levels = [self.register_once()["incident_level"] for _ in range(8)]
         self.assertEqual(levels[0], 0)
@@ -101,6 +144,72 @@ class IncidentLoggingTests(unittest.TestCase):
         self.assertIn("- proximos passos:", contents)
         self.assertIn("- status:", contents)
 
+    def test_async_reports_are_written_after_flush(self):
+        self.manager = self._make_manager(async_reports=True)
+        for _ in range(4):
+            self.register_once()
+        l2 = self.register_once()
+        self.assertIsNotNone(l2["report_path"])
+        self.manager.flush_reports()
+        self.assertTrue(Path(str(l2["report_path"])).exists())
+
+    def test_async_writes_keep_levels_and_persist_after_flush(self):
+        self.manager = self._make_manager(async_writes=True)
+        levels = [self.register_once()["incident_level"] for _ in range(5)]
+        self.assertEqual(levels, [0, 0, 1, 1, 2])
+        self.manager.flush_writes()
+        row = self.db.fetchone("select count(*) as n from incident_events")
+        self.assertEqual(row["n"], 5)
+        state = self.manager.tail(limit=10)
+        self.assertEqual(state[0]["level"], 2)
+        self.assertEqual(state[0]["count_15m"], 5)
+
+    def test_async_writes_retry_each_item_when_batch_fails(self):
+        self.manager = self._make_manager(async_writes=True)
+        real_execute_many_tx = self.db.execute_many_tx
+        calls = []
+
+        def flaky_execute_many_tx(stmts):
+            calls.append(len(stmts))
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return real_execute_many_tx(stmts)
+
+        self.db.execute_many_tx = flaky_execute_many_tx
+        for _ in range(3):
+            self.register_once()
+        self.manager.flush_writes()
+        row = self.db.fetchone("select count(*) as n from incident_events")
+        self.assertEqual(row["n"], 3)
+        self.assertGreater(len(calls), 1)
+        self.assertEqual(self.manager.writes_failed, 0)
+
+    def test_async_writer_survives_unexpected_errors(self):
+        self.manager = self._make_manager(async_writes=True)
+        real_execute_many_tx = self.db.execute_many_tx
+        real_log_event = main.log_event
+        self.addCleanup(setattr, main, "log_event", real_log_event)
+
+        def broken_execute_many_tx(stmts):
+            raise TypeError("unsupported parameter type")
+
+        def broken_log_event(*args, **kwargs):
+            raise RuntimeError("log sink down")
+
+        self.db.execute_many_tx = broken_execute_many_tx
+        main.log_event = broken_log_event
+        self.register_once()
+        self.manager.flush_writes(timeout=1.0)
+        self.assertEqual(self.manager.writes_failed, 1)
+        self.assertEqual(self.manager._pending_states, {})
+
+        self.db.execute_many_tx = real_execute_many_tx
+        main.log_event = real_log_event
+        self.register_once()
+        self.manager.flush_writes(timeout=1.0)
+        row = self.db.fetchone("select count(*) as n from incident_events")
+        self.assertEqual(row["n"], 1)
+
     def test_resets_to_l0_after_30_minutes_without_repeat(self):
         for _ in range(3):
             self.register_once()